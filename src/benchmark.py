@@ -0,0 +1,203 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+# les plot_* appellent plt.show() : backend sans affichage avant tout import de pyplot
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from database import NBADatabase
+from game_analytics import rolling_averages
+from synthetic import generate_players, generate_game_logs
+from utils import calculate_efficiency, compare_players
+from visualizations import (plot_top_scorers, plot_player_comparison, plot_team_analysis,
+                            plot_efficiency_scatter, plot_shooting_percentages)
+
+# Benchmarks des chemins critiques sur des ligues synthétiques de 500 à 1M de lignes.
+#
+#   python benchmark.py                                  # toutes les tailles par défaut
+#   python benchmark.py --sizes 500,5000 --repeat 5
+#   python benchmark.py --compare bench_results/precedent.json
+#
+# Les résultats (min / médiane par opération et par taille) sont écrits en JSON ; --compare
+# signale les opérations plus lentes que la référence au-delà de --threshold (code retour 1).
+
+DEFAULT_SIZES = [500, 5_000, 50_000, 1_000_000]
+RESULTS_DIR = "bench_results"
+# ~500 joueurs par saison, comme une vraie saison NBA, au plus 20 saisons
+PLAYERS_PER_SEASON = 500
+MAX_SEASONS = 20
+
+
+def league_shape(size: int):
+    n_seasons = min(MAX_SEASONS, max(1, size // PLAYERS_PER_SEASON))
+    return n_seasons, size // n_seasons
+
+
+# exécute func `repeat` fois (sortie console masquée) et garde le min et la médiane
+def time_operation(func: Callable, repeat: int) -> Dict:
+
+    runs = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - start)
+        plt.close('all')
+    return {'min_s': round(min(runs), 6), 'median_s': round(statistics.median(runs), 6),
+            'runs': len(runs)}
+
+
+def bench_size(size: int, repeat: int, workdir: str, plots: bool = True) -> Dict:
+
+    n_seasons, n_players = league_shape(size)
+    players = generate_players(n_seasons, n_players)
+    latest = players['season'].max()
+    logs = generate_game_logs(players, latest)
+
+    db_path = os.path.join(workdir, f"bench_{size}.db")
+    db = NBADatabase(db_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.connect()
+        db.create_tables()
+
+    # noms et équipe réellement présents dans les données générées
+    sample = players[players['season'] == latest].nlargest(2, 'ppg')
+    name1, name2 = sample['player_name'].tolist()
+    team = sample['team_name'].iloc[0]
+
+    results = {'rows': len(players), 'seasons': n_seasons, 'game_logs': len(logs)}
+    operations = {}
+    # les écritures ne sont mesurées qu'une fois : la première insertion est le cas réel
+    operations['insert_players'] = time_operation(lambda: db.insert_players(players), 1)
+    operations['insert_game_logs'] = time_operation(lambda: db.insert_game_logs(logs), 1)
+
+    def load_frame():
+        db._players_frame = None
+        db.get_players_frame()
+
+    operations['get_players_frame'] = time_operation(load_frame, repeat)
+    frame = db.get_players_frame()
+    operations['get_top_scorers'] = time_operation(lambda: db.get_top_scorers(10), repeat)
+    operations['get_team_stats'] = time_operation(lambda: db.get_team_stats(team), repeat)
+    operations['calculate_efficiency'] = time_operation(lambda: calculate_efficiency(frame), repeat)
+    operations['compare_players'] = time_operation(
+        lambda: compare_players(db, name1, name2), repeat)
+    operations['rolling_averages'] = time_operation(lambda: rolling_averages(logs), repeat)
+
+    if plots:
+        # les plot_* enregistrent leur PNG dans le dossier courant
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            top = db.get_top_scorers(10)
+            team_data = db.get_team_stats(team)
+            p1 = db.search_players(name1, limit=1)
+            p2 = db.search_players(name2, limit=1)
+            shooters = db.get_ranked('points_per_game', limit=10, min_games=15)
+            operations['plot_top_scorers'] = time_operation(lambda: plot_top_scorers(top, 10), repeat)
+            operations['plot_player_comparison'] = time_operation(
+                lambda: plot_player_comparison(p1, p2), repeat)
+            operations['plot_team_analysis'] = time_operation(
+                lambda: plot_team_analysis(team_data, team), repeat)
+            operations['plot_efficiency_scatter'] = time_operation(
+                lambda: plot_efficiency_scatter(frame), repeat)
+            operations['plot_shooting_percentages'] = time_operation(
+                lambda: plot_shooting_percentages(shooters, 10), repeat)
+        finally:
+            os.chdir(cwd)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.close()
+    results['operations'] = operations
+    return results
+
+
+# opérations plus lentes que la référence (médianes comparées, même taille)
+def find_regressions(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+
+    regressions = []
+    for size, result in current['sizes'].items():
+        reference = baseline.get('sizes', {}).get(size)
+        if not reference:
+            continue
+        for name, timing in result['operations'].items():
+            before = reference['operations'].get(name)
+            if not before or before['median_s'] <= 0:
+                continue
+            ratio = timing['median_s'] / before['median_s']
+            if ratio > threshold:
+                regressions.append(f"{name} @ {size} lignes : {before['median_s']:.4f}s -> "
+                                   f"{timing['median_s']:.4f}s (x{ratio:.2f})")
+    return regressions
+
+
+def run(sizes: List[int], repeat: int, output: Optional[str], plots: bool = True,
+        baseline: Optional[str] = None, threshold: float = 1.25) -> int:
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'sizes': {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="nba_bench_") as workdir:
+        for size in sizes:
+            print(f"⏱  {size:,} lignes...")
+            result = bench_size(size, repeat, workdir, plots)
+            report['sizes'][str(size)] = result
+            for name, timing in result['operations'].items():
+                print(f"   {name:<28} {timing['median_s'] * 1000:>10.1f} ms")
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Résultats enregistrés dans {output}")
+
+    if baseline:
+        with open(baseline, encoding='utf-8') as f:
+            regressions = find_regressions(report, json.load(f), threshold)
+        if regressions:
+            print(f"✗ {len(regressions)} régression(s) (seuil x{threshold}) :")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print(f"✓ Aucune régression par rapport à {baseline}")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
+
+    parser = argparse.ArgumentParser(description="Benchmarks NBA Stats Manager (données synthétiques)")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="nombres de lignes players, séparés par des virgules")
+    parser.add_argument('--repeat', type=int, default=3, help="mesures par opération")
+    parser.add_argument('--output', help=f"fichier JSON (défaut: {RESULTS_DIR}/bench_<date>.json)")
+    parser.add_argument('--no-plots', action='store_true', help="ne pas mesurer les plot_*")
+    parser.add_argument('--compare', help="résultats de référence (JSON) à comparer")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="ratio de médiane au-delà duquel une opération est en régression")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    sys.exit(run(sizes, args.repeat, args.output, not args.no_plots, args.compare, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+import numpy as np
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.colors import LogNorm
+from matplotlib.figure import Figure
+from typing import List, Optional, Sequence, Tuple
+
+# une série de barres : (légende, valeurs, couleur)
+Series = Tuple[str, Sequence[float], str]
+# une étiquette de point : (texte, x, y)
+Label = Tuple[str, float, float]
+
+
+# Graphique intégré à la fenêtre Tk : une seule Figure et un seul canvas pour toute la session.
+# Les barres, points et étiquettes sont gardés d'une vue à l'autre et modifiés sur place.
+# Ils sont "animated" : le fond (axes, titres, graduations) est mémorisé après chaque dessin
+# complet, et une mise à jour des seules valeurs se fait par blit (fond + artistes, sans
+# redessiner la figure). Un changement de forme, de textes ou d'échelle redessine une fois.
+class ChartPanel:
+
+    def __init__(self, master, figsize=(6, 4), dpi=100):
+
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.widget = self.canvas.get_tk_widget()
+
+        self.ax = None
+        self._layout = None         # forme de la vue affichée (type, nombre de barres...)
+        self._static = None         # textes du fond de la vue affichée
+        self._animated = []         # artistes redessinés à chaque blit
+        self._background = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    # après chaque dessin complet : on garde le fond, puis on dessine les artistes animés
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        for artist in self._animated:
+            self.figure.draw_artist(artist)
+
+    def _blit(self):
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.figure.bbox)
+
+    def _reset(self):
+        self.figure.clear()
+        self.ax = self.figure.add_subplot()
+        self._animated = []
+        self._background = None
+
+    # limite haute de l'axe des valeurs : on ne change d'échelle que si les nouvelles valeurs
+    # sortent du cadre ou n'en occupent plus qu'une petite partie
+    @staticmethod
+    def _needs_rescale(current_top: float, data_top: float) -> bool:
+        return data_top > current_top or data_top < current_top * 0.5
+
+    def show_bars(self, title: str, categories: Sequence[str], series: List[Series],
+                  xlabel: str = '', ylabel: str = '', horizontal: bool = False,
+                  value_labels: bool = False, value_limit: Optional[float] = None):
+
+        categories = [str(c) for c in categories]
+        layout = ('bars', horizontal, len(categories), len(series), value_labels)
+        static = (title, tuple(categories), tuple(s[0] for s in series), xlabel, ylabel)
+        values = [np.asarray(s[1], dtype=float) for s in series]
+        data_top = max((v.max() for v in values if len(v)), default=1.0) or 1.0
+
+        if layout != self._layout:
+            self._build_bars(categories, series, horizontal, value_labels)
+            self._layout = layout
+            self._static = None
+
+        # valeurs : hauteurs (ou largeurs) des barres et textes des valeurs
+        for bars, column in zip(self._bars, values):
+            for bar, value in zip(bars, column):
+                if horizontal:
+                    bar.set_width(value)
+                else:
+                    bar.set_height(value)
+        # valeurs à droite des barres horizontales, au-dessus des barres verticales
+        for text, bar in zip(self._value_texts, self._bars[0] if self._bars else []):
+            if horizontal:
+                value = bar.get_width()
+                text.set_position((value + data_top * 0.015, bar.get_y() + bar.get_height() / 2))
+            else:
+                value = bar.get_height()
+                text.set_position((bar.get_x() + bar.get_width() / 2, value + data_top * 0.015))
+            text.set_text(f'{value:.1f}')
+
+        redraw = False
+        get_limit, set_limit = ((self.ax.get_xlim, self.ax.set_xlim) if horizontal
+                                else (self.ax.get_ylim, self.ax.set_ylim))
+        if value_limit is not None:
+            if get_limit() != (0, value_limit):
+                set_limit(0, value_limit)
+                redraw = True
+        elif self._needs_rescale(get_limit()[1], data_top):
+            # place pour les textes de valeurs au bout des barres
+            set_limit(0, data_top * (1.15 if value_labels else 1.05))
+            redraw = True
+
+        if static != self._static:
+            self._set_bar_texts(title, categories, series, xlabel, ylabel, horizontal)
+            self._static = static
+            redraw = True
+
+        if redraw:
+            self.canvas.draw_idle()
+        else:
+            self._blit()
+
+    def _build_bars(self, categories, series, horizontal, value_labels):
+
+        self._reset()
+        x = np.arange(len(categories))
+        width = 0.8 / len(series)
+        self._bars = []
+        for i, (label, values, color) in enumerate(series):
+            offset = (i - (len(series) - 1) / 2) * width
+            draw = self.ax.barh if horizontal else self.ax.bar
+            bars = draw(x + offset, np.zeros(len(categories)), width, label=label, color=color,
+                        edgecolor='black', linewidth=0.5, animated=True)
+            self._bars.append(bars)
+            self._animated.extend(bars)
+
+        self._value_texts = []
+        if value_labels:
+            ha, va = ('left', 'center') if horizontal else ('center', 'bottom')
+            for _ in categories:
+                text = self.ax.text(0, 0, '', ha=ha, va=va, fontsize=8, animated=True)
+                self._value_texts.append(text)
+            self._animated.extend(self._value_texts)
+
+        if horizontal:
+            self.ax.set_yticks(x)
+            self.ax.set_ylim(-0.6, len(categories) - 0.4)
+        else:
+            self.ax.set_xticks(x)
+            self.ax.set_xlim(-0.6, len(categories) - 0.4)
+        self.ax.grid(axis='x' if horizontal else 'y', alpha=0.3, linestyle='--', linewidth=0.5)
+        self.ax.set_axisbelow(True)
+
+    def _set_bar_texts(self, title, categories, series, xlabel, ylabel, horizontal):
+
+        if horizontal:
+            self.ax.set_yticklabels(categories, fontsize=8)
+        else:
+            self.ax.set_xticklabels(categories, rotation=45, ha='right', fontsize=8)
+        self.ax.set_title(title, fontsize=12, fontweight='bold')
+        self.ax.set_xlabel(xlabel, fontsize=9, fontweight='bold')
+        self.ax.set_ylabel(ylabel, fontsize=9, fontweight='bold')
+        for bars, (label, _, _) in zip(self._bars, series):
+            bars.set_label(label)
+        legend = self.ax.get_legend()
+        if legend:
+            legend.remove()
+        if len(series) > 1:
+            self.ax.legend(fontsize=8)
+        self.figure.tight_layout()
+
+    def show_scatter(self, title: str, x: Sequence[float], y: Sequence[float],
+                     sizes: Sequence[float], colors: Sequence[float], labels: List[Label],
+                     xlabel: str = '', ylabel: str = '', color_label: str = ''):
+
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        colors = np.asarray(colors, dtype=float)
+        layout = ('scatter', len(labels))
+        static = (title, xlabel, ylabel, color_label)
+
+        if layout != self._layout:
+            self._build_scatter(len(labels), color_label)
+            self._layout = layout
+            self._static = None
+
+        self._points.set_offsets(np.column_stack([x, y]))
+        self._points.set_sizes(np.asarray(sizes, dtype=float))
+        self._points.set_array(colors)
+        for annotation, (text, px, py) in zip(self._annotations, labels):
+            annotation.set_text(text)
+            annotation.xy = (px, py)
+
+        redraw = False
+        if len(colors):
+            clim = (colors.min(), colors.max())
+            if self._points.get_clim() != clim:
+                # la barre de couleur fait partie du fond
+                self._points.set_clim(*clim)
+                redraw = True
+        if len(x):
+            # la marge autour des points absorbe les petites variations sans changer d'échelle
+            extents = (x.min(), x.max()), (y.min(), y.max())
+            current = self.ax.get_xlim(), self.ax.get_ylim()
+            if any(lo < cur_lo or hi > cur_hi or (hi - lo) < (cur_hi - cur_lo) * 0.5
+                   for (lo, hi), (cur_lo, cur_hi) in zip(extents, current)):
+                self.ax.set_xlim(*self._padded(x))
+                self.ax.set_ylim(*self._padded(y))
+                redraw = True
+
+        if static != self._static:
+            self.ax.set_title(title, fontsize=12, fontweight='bold')
+            self.ax.set_xlabel(xlabel, fontsize=9, fontweight='bold')
+            self.ax.set_ylabel(ylabel, fontsize=9, fontweight='bold')
+            self._colorbar.set_label(color_label, fontsize=9)
+            self.figure.tight_layout()
+            self._static = static
+            redraw = True
+
+        if redraw:
+            self.canvas.draw_idle()
+        else:
+            self._blit()
+
+    @staticmethod
+    def _padded(values: np.ndarray) -> Tuple[float, float]:
+        lo, hi = float(values.min()), float(values.max())
+        margin = (hi - lo) * 0.05 or 1.0
+        return lo - margin, hi + margin
+
+    def _build_scatter(self, n_labels: int, color_label: str):
+
+        self._reset()
+        self._points = self.ax.scatter([], [], s=[], c=[], cmap='viridis', alpha=0.6,
+                                       edgecolors='black', linewidth=0.5, animated=True)
+        self._colorbar = self.figure.colorbar(self._points, ax=self.ax)
+        self._annotations = [
+            self.ax.annotate('', (0, 0), xytext=(5, 5), textcoords='offset points',
+                             fontsize=7, alpha=0.8, animated=True)
+            for _ in range(n_labels)
+        ]
+        self._animated = [self._points] + self._annotations
+        self.ax.grid(alpha=0.3, linestyle='--', linewidth=0.5)
+        self.ax.set_axisbelow(True)
+
+    # nuage agrégé (grille de densité) : l'image est remplacée sur place, quel que soit le
+    # nombre de joueurs derrière la grille
+    def show_density(self, title: str, counts: np.ndarray, extent: Tuple[float, float, float, float],
+                     labels: List[Label], xlabel: str = '', ylabel: str = '',
+                     color_label: str = ''):
+
+        layout = ('density', counts.shape, len(labels))
+        static = (title, xlabel, ylabel, color_label)
+
+        if layout != self._layout:
+            self._build_density(counts.shape, len(labels))
+            self._layout = layout
+            self._static = None
+
+        self._image.set_data(np.ma.masked_equal(counts, 0))
+        for annotation, (text, px, py) in zip(self._annotations, labels):
+            annotation.set_text(text)
+            annotation.xy = (px, py)
+
+        redraw = False
+        clim = (1, max(float(counts.max()), 1.0))
+        if self._image.get_clim() != clim:
+            self._image.set_clim(*clim)
+            redraw = True
+        if tuple(self._image.get_extent()) != tuple(extent):
+            self._image.set_extent(extent)
+            redraw = True
+
+        if static != self._static:
+            self.ax.set_title(title, fontsize=12, fontweight='bold')
+            self.ax.set_xlabel(xlabel, fontsize=9, fontweight='bold')
+            self.ax.set_ylabel(ylabel, fontsize=9, fontweight='bold')
+            self._colorbar.set_label(color_label, fontsize=9)
+            self.figure.tight_layout()
+            self._static = static
+            redraw = True
+
+        if redraw:
+            self.canvas.draw_idle()
+        else:
+            self._blit()
+
+    def _build_density(self, shape: Tuple[int, int], n_labels: int):
+
+        self._reset()
+        self._image = self.ax.imshow(np.ma.masked_all(shape), origin='lower', aspect='auto',
+                                     cmap='viridis', norm=LogNorm(vmin=1, vmax=10),
+                                     interpolation='nearest', animated=True)
+        self._colorbar = self.figure.colorbar(self._image, ax=self.ax)
+        self._annotations = [
+            self.ax.annotate('', (0, 0), xytext=(5, 5), textcoords='offset points',
+                             fontsize=7, alpha=0.8, animated=True)
+            for _ in range(n_labels)
+        ]
+        self._animated = [self._image] + self._annotations
+        self.ax.grid(alpha=0.3, linestyle='--', linewidth=0.5)
+        self.ax.set_axisbelow(True)
@@ -1,134 +1,1060 @@
+import csv
+import gzip
+import io
+import json
+import os
 import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
 import pandas as pd
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Union, Iterator, Callable, Tuple, TextIO
 
+from snapshot import current_snapshot, read_manifest, load_snapshot, write_snapshot
 
-class NBADatabase:
+# clés des données joueurs (dicts ou colonnes du DataFrame), dans l'ordre des colonnes SQL
+PLAYER_KEYS = [
+    'player_id', 'player_name', 'team_name', 'position', 'games_played',
+    'ppg', 'rpg', 'apg', 'spg', 'bpg', 'fg_pct', 'three_pct', 'ft_pct', 'season'
+]
 
-    # inti la connexion a la bdd
-    def __init__(self, db_name: str = "nba_stats.db"):
 
-        self.db_name = db_name
-        self.conn = None
-        self.cursor = None
+# convertit des joueurs (liste de dicts ou DataFrame en colonnes) en tuples prêts pour SQL
+def player_rows(players_data: Union[List[Dict], pd.DataFrame]) -> List[tuple]:
 
-    def connect(self):
-        try:
-            self.conn = sqlite3.connect(self.db_name)
-            self.cursor = self.conn.cursor()
-            print(f"✓ Connexion à {self.db_name} établie")
-        except sqlite3.Error as e:
-            print(f"✗ Erreur de connexion: {e}")
+    if isinstance(players_data, pd.DataFrame):
+        # une colonne à la fois : tolist() rend des types Python natifs que sqlite3 accepte
+        n = len(players_data)
+        columns = [players_data[key].tolist() if key in players_data else [None] * n
+                   for key in PLAYER_KEYS]
+        return list(zip(*columns))
 
-    def create_tables(self):
+    return [tuple(player.get(key) for key in PLAYER_KEYS) for player in players_data]
+
+
+# minuscules sans accents : "Nikola Jokić" -> "nikola jokic"
+def normalize_name(text: Optional[str]) -> str:
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+# transforme une saisie utilisateur en requête FTS5 : chaque mot doit apparaître dans la colonne
+# (le tokenizer trigram a besoin d'au moins 3 caractères par mot, sinon on passe par LIKE)
+def _fts_query(column: str, text: str) -> Optional[str]:
+    words = normalize_name(text).split()
+    if not words or any(len(word) < 3 for word in words):
+        return None
+    phrases = " AND ".join('"' + word.replace('"', '""') + '"' for word in words)
+    return f"{column} : ({phrases})"
+
+
+# remplit l'index de recherche avec les joueurs déjà en base (migration v4)
+def _populate_player_search(cursor: sqlite3.Cursor):
+    rows = cursor.execute("SELECT rowid, player_name, team_name FROM players").fetchall()
+    cursor.executemany(
+        "INSERT INTO player_search (rowid, player_name, team_name) VALUES (?, ?, ?)",
+        [(rowid, normalize_name(name), normalize_name(team)) for rowid, name, team in rows]
+    )
+
+
+# réindexe les saisons données dans player_search (même rowid que la ligne de players) :
+# deux requêtes par lot au lieu d'une par joueur. normalize_name est enregistrée comme
+# fonction SQL sur chaque connexion (ConnectionManager._open)
+def _sync_player_search(cursor: sqlite3.Cursor, seasons: List[str]):
+
+    placeholders = ', '.join('?' * len(seasons))
+    cursor.execute(f"""
+    DELETE FROM player_search
+    WHERE rowid IN (SELECT rowid FROM players WHERE season IN ({placeholders}))
+    """, seasons)
+    cursor.execute(f"""
+    INSERT INTO player_search (rowid, player_name, team_name)
+    SELECT rowid, normalize_name(player_name), normalize_name(team_name)
+    FROM players WHERE season IN ({placeholders})
+    """, seasons)
+
+
+# colonnes générées : nom -> expression SQL
+DERIVED_COLUMNS = {
+    'efficiency': 'points_per_game + rebounds_per_game + assists_per_game',
+}
+
+# statistiques classées dans player_ranks (noms de colonnes, jamais de saisie libre dans le SQL)
+RANKABLE_METRICS = [
+    'points_per_game', 'rebounds_per_game', 'assists_per_game', 'steals_per_game',
+    'blocks_per_game', 'field_goal_pct', 'three_point_pct', 'free_throw_pct',
+    'games_played',
+] + list(DERIVED_COLUMNS)
+
+
+# colonnes de game_logs, dans l'ordre de la table
+GAME_LOG_KEYS = [
+    'player_id', 'game_id', 'season', 'game_date', 'team_name', 'matchup', 'win', 'minutes',
+    'pts', 'reb', 'ast', 'stl', 'blk', 'tov', 'fgm', 'fga', 'fg3m', 'fg3a', 'ftm', 'fta',
+    'plus_minus'
+]
+
+# types pandas compacts pour les matchs (des millions de lignes tiennent en mémoire)
+GAME_LOG_DTYPES = {
+    'player_id': 'int64', 'game_id': 'int64', 'win': 'int8', 'minutes': 'float32',
+    'pts': 'int16', 'reb': 'int16', 'ast': 'int16', 'stl': 'int16', 'blk': 'int16',
+    'tov': 'int16', 'fgm': 'int16', 'fga': 'int16', 'fg3m': 'int16', 'fg3a': 'int16',
+    'ftm': 'int16', 'fta': 'int16', 'plus_minus': 'int16',
+}
+
+
+# un joueur n'est classé que s'il a joué plus de RANK_MIN_GAMES matchs (comme get_top_scorers)
+RANK_MIN_GAMES = 10
+
+# table players entière, dans l'ordre des partitions de l'instantané (saison puis joueur) :
+# lue en SQL ou depuis l'instantané, get_players_frame renvoie exactement le même DataFrame
+PLAYERS_FRAME_QUERY = "SELECT * FROM players ORDER BY season, player_id"
+
+# formats acceptés par NBADatabase.export_players (les .gz sont compressés à la volée)
+EXPORT_FORMATS = ['csv.gz', 'jsonl.gz', 'csv', 'jsonl']
+
+
+# recalcule rangs et percentiles des saisons données, pour chaque statistique classable.
+# Les fonctions de fenêtre de SQLite font le tri une fois ; ensuite lire un top N ou le rang
+# d'un joueur est une simple lecture de la clé primaire de player_ranks
+def _refresh_rankings(cursor: sqlite3.Cursor, seasons: Optional[List[str]] = None,
+                      stats: Optional[List[str]] = None):
+
+    if seasons is None:
+        seasons = [row[0] for row in cursor.execute("SELECT DISTINCT season FROM players")]
+
+    for season in seasons:
+        for stat in stats or RANKABLE_METRICS:
+            cursor.execute("DELETE FROM player_ranks WHERE season = ? AND stat = ?", (season, stat))
+            # stat vient de RANKABLE_METRICS, jamais d'une saisie utilisateur
+            cursor.execute(f"""
+            INSERT INTO player_ranks (season, stat, rank, player_id, value, percentile)
+            SELECT season, ?, RANK() OVER w, player_id, {stat},
+                   ROUND(100.0 * (1 - PERCENT_RANK() OVER w), 1)
+            FROM players
+            WHERE season = ? AND games_played > ? AND {stat} IS NOT NULL
+            WINDOW w AS (ORDER BY {stat} DESC)
+            """, (stat, season, RANK_MIN_GAMES))
+
+
+# recalcule les agrégats des équipes marquées dans team_changes (remplie par les triggers
+# sur players), puis vide la file : seules les équipes touchées par la dernière écriture
+# sont recalculées
+def _refresh_team_aggregates(cursor: sqlite3.Cursor):
+
+    cursor.execute("""
+    DELETE FROM team_aggregates
+    WHERE (season, team_name) IN (SELECT season, team_name FROM team_changes)
+    """)
+    cursor.execute("""
+    INSERT INTO team_aggregates
+    WITH ranked AS (
+        SELECT p.season, p.team_name, p.player_name, p.points_per_game,
+               p.rebounds_per_game, p.assists_per_game,
+               ROW_NUMBER() OVER (PARTITION BY p.season, p.team_name
+                                  ORDER BY p.points_per_game DESC) AS pts_rank,
+               ROW_NUMBER() OVER (PARTITION BY p.season, p.team_name
+                                  ORDER BY p.rebounds_per_game DESC) AS reb_rank,
+               ROW_NUMBER() OVER (PARTITION BY p.season, p.team_name
+                                  ORDER BY p.assists_per_game DESC) AS ast_rank
+        FROM players p
+        JOIN team_changes c ON c.season = p.season AND c.team_name = p.team_name
+    )
+    SELECT season, team_name, COUNT(*),
+           ROUND(SUM(points_per_game), 1),
+           ROUND(AVG(points_per_game), 1),
+           ROUND(AVG(rebounds_per_game), 1),
+           ROUND(AVG(assists_per_game), 1),
+           MAX(CASE WHEN pts_rank = 1 THEN player_name END),
+           MAX(CASE WHEN pts_rank = 1 THEN points_per_game END),
+           MAX(CASE WHEN reb_rank = 1 THEN player_name END),
+           MAX(CASE WHEN reb_rank = 1 THEN rebounds_per_game END),
+           MAX(CASE WHEN ast_rank = 1 THEN player_name END),
+           MAX(CASE WHEN ast_rank = 1 THEN assists_per_game END)
+    FROM ranked
+    GROUP BY season, team_name
+    """)
+    cursor.execute("DELETE FROM team_changes")
+
+
+# Table des joueurs (schéma d'origine, clé player_id seule)
+PLAYERS_TABLE_V1 = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER PRIMARY KEY,
+    player_name TEXT NOT NULL,
+    team_name TEXT,
+    position TEXT,
+    games_played INTEGER,
+    points_per_game REAL,
+    rebounds_per_game REAL,
+    assists_per_game REAL,
+    steals_per_game REAL,
+    blocks_per_game REAL,
+    field_goal_pct REAL,
+    three_point_pct REAL,
+    free_throw_pct REAL,
+    season TEXT,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Table des équipes
+TEAMS_TABLE_V1 = """
+CREATE TABLE IF NOT EXISTS teams (
+    team_id INTEGER PRIMARY KEY,
+    team_name TEXT NOT NULL,
+    wins INTEGER,
+    losses INTEGER,
+    win_pct REAL,
+    season TEXT,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+# Table des joueurs avec une ligne par (joueur, saison) : charger une saison n'écrase plus les autres
+PLAYERS_TABLE_V2 = """
+CREATE TABLE players_v2 (
+    player_id INTEGER NOT NULL,
+    player_name TEXT NOT NULL,
+    team_name TEXT,
+    position TEXT,
+    games_played INTEGER,
+    points_per_game REAL,
+    rebounds_per_game REAL,
+    assists_per_game REAL,
+    steals_per_game REAL,
+    blocks_per_game REAL,
+    field_goal_pct REAL,
+    three_point_pct REAL,
+    free_throw_pct REAL,
+    season TEXT NOT NULL,
+    last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (player_id, season)
+)
+"""
+
+# Migrations du schéma, dans l'ordre. La version de la base est stockée dans PRAGMA user_version :
+# une base en version N n'exécute que les migrations N+1, N+2...
+# Chaque migration est une liste de requêtes SQL (ou de fonctions qui reçoivent le curseur).
+MIGRATIONS = [
+    # v1 : tables d'origine (IF NOT EXISTS pour les bases créées avant les migrations)
+    [PLAYERS_TABLE_V1, TEAMS_TABLE_V1],
+
+    # v2 : clé composite (player_id, season)
+    [
+        PLAYERS_TABLE_V2,
+        """
+        INSERT INTO players_v2
+        SELECT player_id, player_name, team_name, position, games_played,
+               points_per_game, rebounds_per_game, assists_per_game,
+               steals_per_game, blocks_per_game, field_goal_pct,
+               three_point_pct, free_throw_pct, COALESCE(season, 'N/A'), last_updated
+        FROM players
+        """,
+        "DROP TABLE players",
+        "ALTER TABLE players_v2 RENAME TO players",
+    ],
 
-        # Table des joueurs
-        players_table = """
-        CREATE TABLE IF NOT EXISTS players (
-            player_id INTEGER PRIMARY KEY,
-            player_name TEXT NOT NULL,
+    # v3 : index couvrants pour les requêtes de get_top_scorers et get_team_stats
+    # (les top N se lisent directement dans l'index, sans toucher la table ni trier)
+    [
+        """
+        CREATE INDEX IF NOT EXISTS idx_players_scorers
+        ON players (points_per_game DESC, games_played, player_name, team_name,
+                    rebounds_per_game, assists_per_game)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_players_season_scorers
+        ON players (season, points_per_game DESC, games_played, player_name, team_name,
+                    rebounds_per_game, assists_per_game)
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_players_team
+        ON players (team_name COLLATE NOCASE, points_per_game DESC, player_name, position,
+                    games_played, rebounds_per_game, assists_per_game)
+        """,
+    ],
+
+    # v4 : index plein texte (trigrammes) sur les noms de joueurs et d'équipes,
+    # stockés normalisés (sans accents, minuscules). rowid = rowid de la ligne dans players
+    [
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS player_search
+        USING fts5(player_name, team_name, tokenize='trigram')
+        """,
+        _populate_player_search,
+    ],
+
+    # v5 : numéro de version des données, incrémenté à chaque écriture dans players
+    # (sert à savoir si un DataFrame déjà chargé est encore à jour, même entre processus)
+    [
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('data_version', 0)",
+    ],
+
+    # v6 : statistiques dérivées calculées par SQLite (colonnes générées) + index,
+    # les classements se font avec un ORDER BY ... LIMIT qui lit l'index
+    [
+        f"""
+        ALTER TABLE players ADD COLUMN efficiency REAL
+        GENERATED ALWAYS AS ({DERIVED_COLUMNS['efficiency']}) VIRTUAL
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_players_efficiency
+        ON players (efficiency DESC, games_played)
+        """,
+    ],
+
+    # v7 : rangs et percentiles précalculés par saison et par statistique
+    [
+        """
+        CREATE TABLE IF NOT EXISTS player_ranks (
+            season TEXT NOT NULL,
+            stat TEXT NOT NULL,
+            rank INTEGER NOT NULL,
+            player_id INTEGER NOT NULL,
+            value REAL,
+            percentile REAL,
+            PRIMARY KEY (season, stat, rank, player_id)
+        ) WITHOUT ROWID
+        """,
+        # index par joueur commençant par la saison : recalculer une saison ne touche que ses
+        # propres pages, et il couvre get_player_ranks (value compris)
+        """
+        CREATE INDEX IF NOT EXISTS idx_player_ranks_season_player
+        ON player_ranks (season, player_id, value, percentile)
+        """,
+        # saisons dont les classements sont à recalculer. insert_players les marque dans sa
+        # transaction, NBADatabase.refresh_rankings les recalcule ensuite par petites
+        # transactions. version est incrémentée à chaque écriture : une saison modifiée
+        # pendant le recalcul reste marquée
+        """
+        CREATE TABLE IF NOT EXISTS rank_changes (
+            season TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        ) WITHOUT ROWID
+        """,
+        _refresh_rankings,
+    ],
+
+    # v8 : matchs joueur par joueur (boxscores). WITHOUT ROWID : les lignes sont stockées
+    # directement dans l'ordre de la clé, sans rowid ni index séparé
+    [
+        """
+        CREATE TABLE IF NOT EXISTS game_logs (
+            player_id INTEGER NOT NULL,
+            game_id INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            game_date TEXT NOT NULL,
             team_name TEXT,
-            position TEXT,
-            games_played INTEGER,
-            points_per_game REAL,
-            rebounds_per_game REAL,
-            assists_per_game REAL,
-            steals_per_game REAL,
-            blocks_per_game REAL,
-            field_goal_pct REAL,
-            three_point_pct REAL,
-            free_throw_pct REAL,
-            season TEXT,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
+            matchup TEXT,
+            win INTEGER,
+            minutes REAL,
+            pts INTEGER,
+            reb INTEGER,
+            ast INTEGER,
+            stl INTEGER,
+            blk INTEGER,
+            tov INTEGER,
+            fgm INTEGER,
+            fga INTEGER,
+            fg3m INTEGER,
+            fg3a INTEGER,
+            ftm INTEGER,
+            fta INTEGER,
+            plus_minus INTEGER,
+            PRIMARY KEY (player_id, game_id)
+        ) WITHOUT ROWID
+        """,
         """
+        CREATE INDEX IF NOT EXISTS idx_game_logs_season
+        ON game_logs (season, player_id, game_date)
+        """,
+    ],
 
-        # Table des équipes
-        teams_table = """
-        CREATE TABLE IF NOT EXISTS teams (
-            team_id INTEGER PRIMARY KEY,
+    # v9 : équipes par saison (classement) + agrégats par équipe tenus à jour
+    # incrémentalement à partir des joueurs
+    [
+        """
+        CREATE TABLE teams_v2 (
+            team_id INTEGER NOT NULL,
             team_name TEXT NOT NULL,
+            full_name TEXT,
             wins INTEGER,
             losses INTEGER,
             win_pct REAL,
-            season TEXT,
-            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            season TEXT NOT NULL,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (team_id, season)
         )
+        """,
+        """
+        INSERT INTO teams_v2 (team_id, team_name, wins, losses, win_pct, season, last_updated)
+        SELECT team_id, team_name, wins, losses, win_pct, COALESCE(season, 'N/A'), last_updated
+        FROM teams
+        """,
+        "DROP TABLE teams",
+        "ALTER TABLE teams_v2 RENAME TO teams",
+        "CREATE INDEX IF NOT EXISTS idx_teams_season_name ON teams (season, team_name)",
+        """
+        CREATE TABLE IF NOT EXISTS team_aggregates (
+            season TEXT NOT NULL,
+            team_name TEXT NOT NULL,
+            players INTEGER,
+            total_points REAL,
+            avg_points REAL,
+            avg_rebounds REAL,
+            avg_assists REAL,
+            top_scorer TEXT,
+            top_scorer_ppg REAL,
+            top_rebounder TEXT,
+            top_rebounder_rpg REAL,
+            top_passer TEXT,
+            top_passer_apg REAL,
+            PRIMARY KEY (season, team_name)
+        ) WITHOUT ROWID
+        """,
+        # file des équipes à recalculer, alimentée par les triggers ci-dessous.
+        # Dans un trigger, INSERT OR IGNORE prendrait la gestion de conflit de l'instruction
+        # externe (ABORT pour l'upsert de insert_players) et recharger une saison déjà en base
+        # échouerait sur la clé de team_changes ; ON CONFLICT DO NOTHING, lui, est conservé
+        """
+        CREATE TABLE IF NOT EXISTS team_changes (
+            season TEXT NOT NULL,
+            team_name TEXT NOT NULL,
+            PRIMARY KEY (season, team_name)
+        ) WITHOUT ROWID
+        """,
         """
+        CREATE TRIGGER IF NOT EXISTS players_team_insert AFTER INSERT ON players BEGIN
+            INSERT INTO team_changes (season, team_name)
+            SELECT new.season, new.team_name WHERE new.team_name IS NOT NULL
+            ON CONFLICT DO NOTHING;
+        END
+        """,
+        # un joueur transféré modifie son ancienne et sa nouvelle équipe
+        """
+        CREATE TRIGGER IF NOT EXISTS players_team_update AFTER UPDATE ON players BEGIN
+            INSERT INTO team_changes (season, team_name)
+            SELECT old.season, old.team_name WHERE old.team_name IS NOT NULL
+            ON CONFLICT DO NOTHING;
+            INSERT INTO team_changes (season, team_name)
+            SELECT new.season, new.team_name WHERE new.team_name IS NOT NULL
+            ON CONFLICT DO NOTHING;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS players_team_delete AFTER DELETE ON players BEGIN
+            INSERT INTO team_changes (season, team_name)
+            SELECT old.season, old.team_name WHERE old.team_name IS NOT NULL
+            ON CONFLICT DO NOTHING;
+        END
+        """,
+        # premier calcul pour toutes les équipes déjà en base
+        """
+        INSERT OR IGNORE INTO team_changes
+        SELECT DISTINCT season, team_name FROM players WHERE team_name IS NOT NULL
+        """,
+        _refresh_team_aggregates,
+    ],
+]
+
+
+# une connexion SQLite par thread + un seul écrivain à la fois.
+# En mode WAL les lecteurs ne bloquent pas l'écrivain (et inversement), donc les requêtes
+# peuvent tourner dans des threads de travail pendant une ingestion.
+class ConnectionManager:
+
+    def __init__(self, db_name: str, fast_writes: bool = False, timeout: float = 30.0):
+
+        self.db_name = db_name
+        self.fast_writes = fast_writes
+        self.timeout = timeout
+        self._local = threading.local()
+        # un seul écrivain par processus, BEGIN IMMEDIATE s'occupe des autres processus
+        self._write_lock = threading.RLock()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+
+        # isolation_level=None : pas de transaction implicite, elles passent par transaction()
+        # check_same_thread=False uniquement pour que close_all() puisse tout fermer :
+        # chaque connexion reste utilisée par un seul thread
+        conn = sqlite3.connect(self.db_name, timeout=self.timeout,
+                               isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        # utilisée par _sync_player_search pour remplir l'index de recherche en une requête
+        conn.create_function('normalize_name', 1, normalize_name, deterministic=True)
+        if self.fast_writes:
+            # WAL + synchronous=NORMAL : un seul fsync par checkpoint au lieu d'un par commit
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA cache_size=-65536")  # 64 Mo
+            conn.execute("PRAGMA temp_store=MEMORY")
+
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
 
+    # connexion du thread courant (ouverte au premier appel)
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._open()
+        return conn
+
+    # transaction d'écriture : commit à la sortie du bloc, rollback si exception
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+
+        with self._write_lock:
+            conn = self.connection()
+            if conn.in_transaction:
+                # transaction imbriquée : elle fait partie de celle déjà ouverte
+                yield conn
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def close_all(self):
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class NBADatabase:
+
+    # inti la connexion a la bdd
+    # fast_writes active des pragmas adaptés aux gros imports (synchronous, cache)
+    # snapshot_dir : dossier d'un instantané colonne (snapshot.py) utilisé pour charger
+    # la table players sans passer par SQL tant que la version des données n'a pas changé
+    def __init__(self, db_name: str = "nba_stats.db", fast_writes: bool = False,
+                 snapshot_dir: Optional[str] = None):
+
+        self.db_name = db_name
+        self.fast_writes = fast_writes
+        self.snapshot_dir = snapshot_dir
+        self.connections = None
+        # table players gardée en mémoire, avec la version des données correspondante
+        self._players_frame = None
+        self._players_frame_version = None
+        self._players_frame_lock = threading.Lock()
+        # fonctions appelées après chaque insert_players avec les clés (player_id, season) écrites
+        self._write_listeners = []
+
+    def connect(self):
         try:
-            self.cursor.execute(players_table)
-            self.cursor.execute(teams_table)
-            self.conn.commit()
-            print("✓ Tables créées avec succès")
+            self.connections = ConnectionManager(self.db_name, self.fast_writes)
+            self.connections.connection()
+            print(f"✓ Connexion à {self.db_name} établie")
+        except sqlite3.Error as e:
+            print(f"✗ Erreur de connexion: {e}")
+
+    # connexion propre au thread appelant : utilisable depuis n'importe quel thread
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        if self.connections is None:
+            return None
+        return self.connections.connection()
+
+    @property
+    def cursor(self) -> Optional[sqlite3.Cursor]:
+        conn = self.conn
+        return conn.cursor() if conn else None
+
+    # with db.transaction() as conn: ... (écriture atomique, un seul écrivain à la fois)
+    def transaction(self):
+        return self.connections.transaction()
+
+    # permet aux structures dérivées (index de similarité...) de se mettre à jour
+    # uniquement pour les lignes modifiées
+    def add_write_listener(self, listener: Callable[[List[Tuple[int, str]]], None]):
+        self._write_listeners.append(listener)
+
+    def remove_write_listener(self, listener: Callable[[List[Tuple[int, str]]], None]):
+        if listener in self._write_listeners:
+            self._write_listeners.remove(listener)
+
+    def _notify_write(self, keys: List[Tuple[int, str]]):
+        for listener in list(self._write_listeners):
+            try:
+                listener(keys)
+            except Exception as e:
+                print(f"✗ Erreur mise à jour après écriture: {e}")
+
+    # applique les migrations manquantes, chacune dans sa propre transaction
+    def create_tables(self):
+
+        try:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                with self.transaction() as conn:
+                    cursor = conn.cursor()
+                    for step in migration:
+                        if callable(step):
+                            step(cursor)
+                        else:
+                            cursor.execute(step)
+                    # PRAGMA n'accepte pas de paramètre lié, number est un int contrôlé
+                    cursor.execute(f"PRAGMA user_version = {number}")
+                print(f"✓ Migration v{number} appliquée")
+            print(f"✓ Tables créées avec succès (schéma v{len(MIGRATIONS)})")
+            # classements laissés en attente par un processus interrompu
+            self.refresh_rankings()
         except sqlite3.Error as e:
             print(f"✗ Erreur création tables: {e}")
 
-    def insert_players(self, players_data: List[Dict]):
+    # upsert en masse : un seul executemany dans une seule transaction.
+    # Lève sqlite3.Error si l'écriture échoue (rien n'est écrit)
+    def insert_players(self, players_data: Union[List[Dict], pd.DataFrame]):
         insert_query = """
-        INSERT OR REPLACE INTO players (
+        INSERT INTO players (
             player_id, player_name, team_name, position, games_played,
             points_per_game, rebounds_per_game, assists_per_game,
             steals_per_game, blocks_per_game, field_goal_pct,
             three_point_pct, free_throw_pct, season
         ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(player_id, season) DO UPDATE SET
+            player_name = excluded.player_name,
+            team_name = excluded.team_name,
+            position = excluded.position,
+            games_played = excluded.games_played,
+            points_per_game = excluded.points_per_game,
+            rebounds_per_game = excluded.rebounds_per_game,
+            assists_per_game = excluded.assists_per_game,
+            steals_per_game = excluded.steals_per_game,
+            blocks_per_game = excluded.blocks_per_game,
+            field_goal_pct = excluded.field_goal_pct,
+            three_point_pct = excluded.three_point_pct,
+            free_throw_pct = excluded.free_throw_pct,
+            last_updated = CURRENT_TIMESTAMP
+        """
+
+
+        start = time.perf_counter()
+        try:
+            rows = player_rows(players_data)
+            # le bloc `with` commit à la fin, ou rollback si une ligne échoue
+            with self.transaction() as conn:
+                conn.executemany(insert_query, rows)
+                seasons = sorted({row[-1] for row in rows})
+                _sync_player_search(conn.cursor(), seasons)
+                # agrégats recalculés uniquement pour les équipes touchées ; les classements
+                # des saisons touchées sont recalculés après le commit (refresh_rankings)
+                _refresh_team_aggregates(conn.cursor())
+                conn.executemany("""
+                INSERT INTO rank_changes (season, version) VALUES (?, 1)
+                ON CONFLICT(season) DO UPDATE SET version = version + 1
+                """, [(season,) for season in seasons])
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'data_version'")
+            elapsed = time.perf_counter() - start
+            rate = len(players_data) / elapsed if elapsed > 0 else float('inf')
+            print(f"✓ {len(players_data)} joueurs insérés/mis à jour "
+                  f"({elapsed:.2f}s, {rate:,.0f} lignes/s)")
+        except sqlite3.Error as e:
+            # la transaction est annulée : l'appelant doit savoir que rien n'a été écrit
+            print(f"✗ Erreur insertion: {e}")
+            raise
+
+        # les joueurs sont écrits : un échec ici laisse seulement les saisons marquées
+        try:
+            self.refresh_rankings()
+        except sqlite3.Error as e:
+            print(f"✗ Erreur recalcul des classements: {e}")
+
+        self._notify_write([(row[0], row[-1]) for row in rows])
+
+    # recalcule les classements des saisons marquées dans rank_changes, une transaction par
+    # statistique : le verrou d'écriture n'est gardé que le temps d'un classement
+    def refresh_rankings(self) -> List[str]:
+
+        pending = self.conn.execute(
+            "SELECT season, version FROM rank_changes ORDER BY season").fetchall()
+        start = time.perf_counter()
+        for season, version in pending:
+            for stat in RANKABLE_METRICS:
+                with self.transaction() as conn:
+                    _refresh_rankings(conn.cursor(), [season], [stat])
+            with self.transaction() as conn:
+                # une écriture pendant le recalcul a incrémenté version : la saison reste marquée
+                conn.execute("DELETE FROM rank_changes WHERE season = ? AND version = ?",
+                             (season, version))
+        if pending:
+            print(f"✓ Classements recalculés ({len(pending)} saison(s), "
+                  f"{time.perf_counter() - start:.2f}s)")
+        return [season for season, _ in pending]
+
+    # lignes complètes pour une liste de clés (player_id, season)
+    def get_players_by_keys(self, keys: List[Tuple[int, str]]) -> pd.DataFrame:
+
+        conn = self.conn
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup_keys (player_id INTEGER, season TEXT)")
+        conn.execute("DELETE FROM lookup_keys")
+        conn.executemany("INSERT INTO lookup_keys VALUES (?, ?)", keys)
+        return pd.read_sql_query("""
+        SELECT p.* FROM lookup_keys k
+        JOIN players p ON p.player_id = k.player_id AND p.season = k.season
+        """, conn)
+
+    # classement des équipes (DataFrame de NBAStatsScraper.fetch_standings)
+    def insert_teams(self, standings: pd.DataFrame):
+
+        query = """
+        INSERT INTO teams (team_id, team_name, full_name, wins, losses, win_pct, season)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(team_id, season) DO UPDATE SET
+            team_name = excluded.team_name,
+            full_name = excluded.full_name,
+            wins = excluded.wins,
+            losses = excluded.losses,
+            win_pct = excluded.win_pct,
+            last_updated = CURRENT_TIMESTAMP
         """
 
         try:
-            for player in players_data:
-                self.cursor.execute(insert_query, (
-                    player.get('player_id'),
-                    player.get('player_name'),
-                    player.get('team_name'),
-                    player.get('position'),
-                    player.get('games_played'),
-                    player.get('ppg'),
-                    player.get('rpg'),
-                    player.get('apg'),
-                    player.get('spg'),
-                    player.get('bpg'),
-                    player.get('fg_pct'),
-                    player.get('three_pct'),
-                    player.get('ft_pct'),
-                    player.get('season')
-                ))
-            self.conn.commit()
-            print(f"✓ {len(players_data)} joueurs insérés/mis à jour")
+            keys = ['team_id', 'team_name', 'full_name', 'wins', 'losses', 'win_pct', 'season']
+            columns = [standings[key].tolist() for key in keys]
+            with self.transaction() as conn:
+                conn.executemany(query, zip(*columns))
+            print(f"✓ {len(standings)} équipes insérées/mises à jour")
         except sqlite3.Error as e:
             print(f"✗ Erreur insertion: {e}")
+            raise
+
+    # insertion en masse des matchs (DataFrame de NBAStatsScraper.fetch_game_logs)
+    def insert_game_logs(self, logs: pd.DataFrame):
+
+        query = f"""
+        INSERT OR REPLACE INTO game_logs ({', '.join(GAME_LOG_KEYS)})
+        VALUES ({', '.join('?' * len(GAME_LOG_KEYS))})
+        """
+
+        # une erreur SQLite annule la transaction et remonte à l'appelant (comme insert_players)
+        start = time.perf_counter()
+        columns = [logs[key].tolist() for key in GAME_LOG_KEYS]
+        with self.transaction() as conn:
+            conn.executemany(query, zip(*columns))
+        elapsed = time.perf_counter() - start
+        rate = len(logs) / elapsed if elapsed > 0 else float('inf')
+        print(f"✓ {len(logs)} matchs insérés/mis à jour "
+              f"({elapsed:.2f}s, {rate:,.0f} lignes/s)")
+
+    # matchs triés par joueur puis par date, avec des types compacts
+    def get_game_logs(self, season: Optional[str] = None,
+                      player_ids: Optional[List[int]] = None) -> pd.DataFrame:
+
+        query = f"SELECT {', '.join(GAME_LOG_KEYS)} FROM game_logs WHERE 1 = 1"
+        params = []
+        if season:
+            query += " AND season = ?"
+            params.append(season)
+        if player_ids:
+            query += f" AND player_id IN ({', '.join('?' * len(player_ids))})"
+            params.extend(player_ids)
+        query += " ORDER BY player_id, game_date"
+
+        logs = pd.read_sql_query(query, self.conn, params=params)
+        logs = logs.astype(GAME_LOG_DTYPES)
+        logs['game_date'] = pd.to_datetime(logs['game_date'])
+        return logs
+
+    # version courante des données (incrémentée par insert_players)
+    def get_data_version(self) -> int:
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'data_version'").fetchone()
+        return row[0] if row else 0
+
+    # toute la table players, chargée une seule fois puis réutilisée tant qu'il n'y a pas
+    # eu d'écriture. Le DataFrame est partagé : les appelants ne doivent pas le modifier
+    def get_players_frame(self) -> pd.DataFrame:
+
+        with self._players_frame_lock:
+            version = self.get_data_version()
+            if self._players_frame is None or self._players_frame_version != version:
+                self._players_frame = self._load_players_frame(version)
+                self._players_frame_version = version
+            return self._players_frame
 
-    def get_top_scorers(self, limit: int = 10) -> pd.DataFrame:
+    # lit l'instantané s'il correspond à cette version des données, sinon relit la table
+    # et réécrit l'instantané pour les prochains lancements (CLI, GUI, autres processus)
+    def _load_players_frame(self, version: int) -> pd.DataFrame:
+
+        if self.snapshot_dir is None:
+            return pd.read_sql_query(PLAYERS_FRAME_QUERY, self.conn)
+
+        current = current_snapshot(self.snapshot_dir)
+        manifest = read_manifest(current) if current else None
+        if manifest and manifest.get('data_version') == version \
+                and manifest.get('source') == os.path.abspath(self.db_name):
+            try:
+                return load_snapshot(current)
+            except (OSError, ValueError) as e:
+                # version supprimée entre-temps par un autre écrivain, fichier illisible...
+                print(f"✗ Instantané illisible, lecture SQL: {e}")
+
+        frame = pd.read_sql_query(PLAYERS_FRAME_QUERY, self.conn)
+        try:
+            write_snapshot(frame, self.snapshot_dir, version,
+                           source=os.path.abspath(self.db_name))
+        except OSError as e:
+            print(f"✗ Erreur lors de l'écriture de l'instantané: {e}")
+        return frame
+
+    # season=None : toutes les saisons chargées
+    def get_top_scorers(self, limit: int = 10, season: Optional[str] = None) -> pd.DataFrame:
 
         query = """
         SELECT player_name, team_name, games_played, points_per_game, 
                rebounds_per_game, assists_per_game
         FROM players
         WHERE games_played > 10
+        """
+        params = []
+        if season:
+            query += " AND season = ?"
+            params.append(season)
+        query += """
         ORDER BY points_per_game DESC
         LIMIT ?
         """
-        return pd.read_sql_query(query, self.conn, params=(limit,))
+        params.append(limit)
+        return pd.read_sql_query(query, self.conn, params=params)
 
-    def get_team_stats(self, team_name: str) -> pd.DataFrame:
+    # recherche de joueurs par nom (sans accents ni casse), les plus pertinents en premier
+    def search_players(self, name: str, limit: Optional[int] = None,
+                       season: Optional[str] = None) -> pd.DataFrame:
+
+        match = _fts_query('player_name', name)
+        if match:
+            query = """
+            SELECT p.* FROM player_search s JOIN players p ON p.rowid = s.rowid
+            WHERE player_search MATCH ?
+            """
+            params = [match]
+        else:
+            # mot trop court pour les trigrammes : LIKE sur les noms normalisés
+            query = """
+            SELECT p.* FROM player_search s JOIN players p ON p.rowid = s.rowid
+            WHERE s.player_name LIKE ?
+            """
+            params = [f"%{normalize_name(name)}%"]
+
+        if season:
+            query += " AND p.season = ?"
+            params.append(season)
+        if match:
+            query += " ORDER BY s.rank, p.points_per_game DESC"
+        else:
+            query += " ORDER BY p.points_per_game DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    # saison la plus récente chargée (lue dans l'index season)
+    def get_latest_season(self) -> Optional[str]:
+        return self.conn.execute("SELECT MAX(season) FROM players").fetchone()[0]
+
+    # top N déjà classé pour une statistique (lecture de player_ranks dans l'ordre de la clé).
+    # player_ranks ne contient que les joueurs à plus de RANK_MIN_GAMES matchs ; min_games
+    # restreint encore aux joueurs ayant joué au moins min_games matchs (graphique de tir : 15)
+    def get_ranked(self, stat: str, season: Optional[str] = None, limit: int = 10,
+                   min_games: Optional[int] = None) -> pd.DataFrame:
+
+        if stat not in RANKABLE_METRICS:
+            raise ValueError(f"Statistique inconnue: {stat} "
+                             f"(possibles: {', '.join(RANKABLE_METRICS)})")
 
         query = """
-        SELECT player_name, position, games_played, points_per_game,
-               rebounds_per_game, assists_per_game
-        FROM players
-        WHERE team_name LIKE ?
-        ORDER BY points_per_game DESC
+        SELECT p.*, r.rank, r.percentile
+        FROM player_ranks r
+        JOIN players p ON p.player_id = r.player_id AND p.season = r.season
+        WHERE r.season = ? AND r.stat = ? AND p.games_played >= ?
+        ORDER BY r.rank
+        LIMIT ?
         """
-        return pd.read_sql_query(query, self.conn, params=(f"%{team_name}%",))
+        season = season or self.get_latest_season()
+        return pd.read_sql_query(query, self.conn, params=(season, stat, min_games or 0, limit))
 
-    def export_to_csv(self, filename: str = "nba_stats_export.csv"):
+    # rang et percentile d'un joueur pour chaque statistique
+    def get_player_ranks(self, player_id: int, season: Optional[str] = None) -> pd.DataFrame:
+
+        query = """
+        SELECT stat, value, rank, percentile
+        FROM player_ranks
+        WHERE player_id = ? AND season = ?
+        """
+        season = season or self.get_latest_season()
+        return pd.read_sql_query(query, self.conn, params=(player_id, season))
+
+    # vue d'ensemble des équipes : agrégats précalculés + bilan victoires/défaites
+    def get_team_summaries(self, season: Optional[str] = None,
+                           team_name: Optional[str] = None) -> pd.DataFrame:
+
+        query = """
+        SELECT a.*, t.full_name, t.wins, t.losses, t.win_pct
+        FROM team_aggregates a
+        LEFT JOIN teams t ON t.season = a.season AND t.team_name = a.team_name
+        WHERE a.season = ?
+        """
+        params = [season or self.get_latest_season()]
+        if team_name:
+            query += " AND a.team_name = ? COLLATE NOCASE"
+            params.append(team_name)
+        query += " ORDER BY t.win_pct DESC, a.total_points DESC"
+        return pd.read_sql_query(query, self.conn, params=params)
+
+    # meilleure correspondance (player_id, season) pour un nom saisi, même recherche que
+    # search_players. Sert aussi au rendu sur DataFrame (rendering.resolve_job)
+    def resolve_player(self, name: str, season: Optional[str] = None) -> Optional[Tuple[int, str]]:
+        found = self.search_players(name, limit=1, season=season)
+        if found.empty:
+            return None
+        return int(found['player_id'].iloc[0]), found['season'].iloc[0]
+
+    # abréviation stockée dans players pour une équipe saisie : abréviation exacte ("lal"),
+    # nom complet ou surnom ("Lakers", via la table teams), sinon recherche partielle dans
+    # l'index plein texte. Sert à get_team_stats et au rendu (rendering.resolve_job)
+    def resolve_team(self, team_name: str) -> Optional[str]:
+
+        exact = self.conn.execute(
+            "SELECT team_name FROM players WHERE team_name = ? COLLATE NOCASE LIMIT 1",
+            (team_name,)).fetchone()
+        if exact:
+            return exact[0]
+
+        full = self.conn.execute(
+            "SELECT team_name FROM teams WHERE full_name LIKE ? ORDER BY season DESC LIMIT 1",
+            (f"%{team_name}%",)).fetchone()
+        if full:
+            return full[0]
+
+        match = _fts_query('team_name', team_name)
+        if match:
+            where = "WHERE player_search MATCH ?"
+            param = match
+        else:
+            where = "WHERE s.team_name LIKE ?"
+            param = f"%{normalize_name(team_name)}%"
+        partial = self.conn.execute(f"""
+        SELECT p.team_name FROM players p
+        JOIN player_search s ON s.rowid = p.rowid
+        {where}
+        ORDER BY p.points_per_game DESC
+        LIMIT 1
+        """, (param,)).fetchone()
+        return partial[0] if partial else None
+
+    def get_team_stats(self, team_name: str) -> pd.DataFrame:
+
+        # lecture dans l'index de l'équipe, déjà trié par points
+        return pd.read_sql_query("""
+        SELECT p.player_name, p.team_name, p.position, p.games_played, p.points_per_game,
+               p.rebounds_per_game, p.assists_per_game
+        FROM players p
+        WHERE p.team_name = ? COLLATE NOCASE
+        ORDER BY p.points_per_game DESC
+        """, self.conn, params=(self.resolve_team(team_name),))
+
+    # export en flux : les lignes sont lues par lots (fetchmany) et écrites au fur et à mesure,
+    # la mémoire utilisée ne dépend donc pas du nombre de lignes exportées.
+    # target : chemin de fichier ou '-' pour la sortie standard
+    # fmt : 'csv', 'csv.gz', 'jsonl' ou 'jsonl.gz' (déduit de l'extension si absent)
+    # les filtres (saison, équipe, matchs joués minimum) sont appliqués dans la requête SQL
+    def export_players(self, target: str = "nba_stats_export.csv", fmt: Optional[str] = None,
+                       season: Optional[str] = None, team: Optional[str] = None,
+                       min_games: Optional[int] = None, batch_size: int = 5000,
+                       stream: Optional[TextIO] = None) -> int:
+
+        if fmt is None:
+            fmt = next((f for f in EXPORT_FORMATS if target.endswith('.' + f)), 'csv')
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format d'export inconnu: {fmt} ({', '.join(EXPORT_FORMATS)})")
+
+        conditions, params = [], []
+        if season:
+            conditions.append("season = ?")
+            params.append(season)
+        if team:
+            conditions.append("team_name = ? COLLATE NOCASE")
+            params.append(team)
+        if min_games:
+            conditions.append("games_played >= ?")
+            params.append(min_games)
 
         query = "SELECT * FROM players"
-        df = pd.read_sql_query(query, self.conn)
-        df.to_csv(filename, index=False)
-        print(f"✓ Données exportées vers {filename}")
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY season, player_id"
+
+        # curseur dédié : ne pas partager self.cursor pendant une lecture par lots
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        columns = [col[0] for col in cursor.description]
+
+        to_stdout = target == '-'
+        # stream : vraie sortie standard quand sys.stdout est redirigé (mode batch)
+        stdout = stream or sys.stdout
+        if to_stdout and fmt.endswith('.gz'):
+            # gzip sur stdout : compressé dans le tampon binaire, sous la sortie texte
+            stdout.flush()
+            out = io.TextIOWrapper(gzip.GzipFile(fileobj=stdout.buffer, mode='wb'),
+                                   encoding='utf-8', newline='')
+        elif to_stdout:
+            out = stdout
+        elif fmt.endswith('.gz'):
+            out = gzip.open(target, 'wt', encoding='utf-8', newline='')
+        else:
+            out = open(target, 'w', encoding='utf-8', newline='')
+
+        count = 0
+        try:
+            if fmt.startswith('csv'):
+                writer = csv.writer(out)
+                writer.writerow(columns)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                if fmt.startswith('csv'):
+                    writer.writerows(rows)
+                else:
+                    out.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+                                   for row in rows)
+                count += len(rows)
+        finally:
+            cursor.close()
+            if out is stdout:
+                out.flush()
+            else:
+                # fermer le GzipFile écrit la fin du flux gzip, sans fermer stdout
+                out.close()
+                if to_stdout:
+                    stdout.buffer.flush()
+
+        # sur stdout les messages partent sur stderr pour ne pas polluer les données
+        print(f"✓ {count} lignes exportées vers {'stdout' if to_stdout else target}",
+              file=sys.stderr if to_stdout else sys.stdout)
+        return count
+
+    def export_to_csv(self, filename: str = "nba_stats_export.csv"):
+        self.export_players(filename, fmt='csv')
 
     def close(self):
-        if self.conn:
-            self.conn.close()
+        if self.connections:
+            self.connections.close_all()
+            self.connections = None
             print("✓ Connexion fermée")
 
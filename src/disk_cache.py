@@ -0,0 +1,46 @@
+import os
+import time
+from typing import Callable, List, Optional, Tuple
+
+# Fonctions communes aux caches disque (réponses de l'API dans scraper.ResponseCache, images
+# dans rendering.ChartCache) : un fichier par entrée, dont la date de modification sert de
+# date de dernier usage (mise à jour par os.utime à chaque lecture).
+
+
+# (date de modification, taille, chemin) des entrées du cache ; is_entry filtre les noms
+# de fichiers (fichiers temporaires exclus)
+def cache_entries(directory: str, is_entry: Callable[[str], bool]) -> List[Tuple[float, int, str]]:
+
+    entries = []
+    for name in os.listdir(directory):
+        if not is_entry(name):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # supprimé entre-temps par un autre processus
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+# supprime les entrées les moins récemment utilisées tant que le cache dépasse max_size_bytes,
+# ainsi que celles inutilisées depuis plus de max_age secondes. Retourne le nombre supprimé
+def evict_lru(directory: str, max_size_bytes: int, is_entry: Callable[[str], bool],
+              max_age: Optional[float] = None) -> int:
+
+    entries = cache_entries(directory, is_entry)
+    now = time.time()
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for mtime, size, path in sorted(entries):
+        if total <= max_size_bytes and (max_age is None or now - mtime <= max_age):
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+    return evicted
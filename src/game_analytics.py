@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional
+
+# Analyses sur les matchs (table game_logs).
+# Tout est calculé sur des tableaux NumPy triés par (player_id, game_date) : les fenêtres
+# glissantes et les séries passent par des sommes cumulées et des indices de début de groupe,
+# sans boucle Python par joueur ni par match.
+
+DEFAULT_STATS = ['pts', 'reb', 'ast']
+
+
+def _sorted(logs: pd.DataFrame) -> pd.DataFrame:
+    return logs.sort_values(['player_id', 'game_date'], kind='stable').reset_index(drop=True)
+
+
+# pour chaque ligne, l'indice de la première ligne du même joueur
+def _group_starts(player_ids: np.ndarray) -> np.ndarray:
+    n = len(player_ids)
+    is_start = np.ones(n, dtype=bool)
+    is_start[1:] = player_ids[1:] != player_ids[:-1]
+    starts = np.flatnonzero(is_start)
+    return starts[np.cumsum(is_start) - 1]
+
+
+# moyennes sur les N derniers matchs de chaque joueur (match courant inclus)
+def rolling_averages(logs: pd.DataFrame, window: int = 5, stats: Optional[List[str]] = None,
+                     min_periods: int = 1) -> pd.DataFrame:
+
+    stats = stats or DEFAULT_STATS
+    logs = _sorted(logs)
+    index = np.arange(len(logs))
+    starts = _group_starts(logs['player_id'].to_numpy())
+
+    # début de la fenêtre : N matchs en arrière, sans déborder sur le joueur précédent
+    window_start = np.maximum(index - window + 1, starts)
+    count = index - window_start + 1
+
+    for stat in stats:
+        values = logs[stat].to_numpy(dtype=float)
+        cumsum = np.concatenate(([0.0], np.cumsum(values)))
+        sums = cumsum[index + 1] - cumsum[window_start]
+        means = sums / count
+        means[count < min_periods] = np.nan
+        logs[f'{stat}_avg{window}'] = means.round(1)
+
+    return logs
+
+
+# longueur de la série en cours à chaque match : matchs consécutifs où la condition est vraie
+# ex. streaks(logs, logs['pts'] >= 20) ou streaks(logs, logs['win'] == 1)
+def streaks(logs: pd.DataFrame, condition: pd.Series, name: str = 'streak') -> pd.DataFrame:
+
+    logs = logs.assign(_flag=condition.to_numpy(dtype=bool))
+    logs = _sorted(logs)
+    flag = logs.pop('_flag').to_numpy()
+    index = np.arange(len(logs))
+    starts = _group_starts(logs['player_id'].to_numpy())
+
+    # une série (re)commence au premier match du joueur ou quand la condition redevient vraie
+    is_break = ~flag
+    last_break = np.where(is_break, index, -1)
+    last_break = np.maximum.accumulate(last_break)
+    run_start = np.maximum(last_break + 1, starts)
+    logs[name] = np.where(flag, index - run_start + 1, 0)
+    return logs
+
+
+# plus longue série de chaque joueur
+def longest_streaks(logs: pd.DataFrame, condition: pd.Series) -> pd.DataFrame:
+
+    with_streaks = streaks(logs, condition)
+    best = with_streaks.groupby('player_id', sort=False)['streak'].max()
+    return best.sort_values(ascending=False).rename('longest_streak').reset_index()
+
+
+# forme du moment : moyenne sur les `short` derniers matchs moins moyenne sur les `long`
+# derniers. > 0 : le joueur est au-dessus de son niveau récent
+def form_trends(logs: pd.DataFrame, stat: str = 'pts', short: int = 5,
+                long: int = 20) -> pd.DataFrame:
+
+    rolled = rolling_averages(logs, short, [stat])
+    rolled = rolling_averages(rolled, long, [stat])
+    rolled['trend'] = (rolled[f'{stat}_avg{short}'] - rolled[f'{stat}_avg{long}']).round(1)
+
+    # dernier match de chaque joueur = son état de forme actuel
+    last = np.ones(len(rolled), dtype=bool)
+    player_ids = rolled['player_id'].to_numpy()
+    last[:-1] = player_ids[:-1] != player_ids[1:]
+    current = rolled.loc[last, ['player_id', 'game_date', f'{stat}_avg{short}',
+                                f'{stat}_avg{long}', 'trend']]
+    return current.sort_values('trend', ascending=False).reset_index(drop=True)
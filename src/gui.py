@@ -1,11 +1,15 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import pandas as pd
 from database import NBADatabase  # Enlève "src."
-from scraper import NBAStatsScraper
-from visualizations import (plot_top_scorers, plot_player_comparison,
-                            plot_team_analysis, plot_efficiency_scatter,
-                            plot_shooting_percentages)
+from rendering import ChartCache
+from tasks import TaskRunner
+from utils import format_team_summary
+from visualizations import (build_top_scorers, build_player_comparison,
+                            build_team_analysis, build_efficiency_scatter,
+                            save_figure, efficiency_scatter_data)
+
+# La fenêtre s'ouvre sans nba_api ni matplotlib : le scraper est importé à la première
+# récupération, le panneau graphique (et matplotlib) au premier graphique affiché
 
 
 class NBAStatsGUI:
@@ -17,10 +21,20 @@ class NBAStatsGUI:
         self.root.configure(bg='#000000')
 
         # Connexion à la base de données
-        self.db = NBADatabase()
+        self.db = NBADatabase(snapshot_dir="snapshots")
         self.db.connect()
         self.db.create_tables()
 
+        # les appels réseau, l'insertion et le rendu des graphiques tournent en arrière-plan
+        self.tasks = TaskRunner(self.root)
+        # images déjà rendues, retrouvées par le contenu des données affichées
+        self.chart_cache = ChartCache()
+        # scraper créé au premier fetch (import de nba_api) puis gardé : un seul cache de l'API
+        self.scraper = None
+        # graphique affiché : (fonction build_*, arguments, fichier) pour "Enregistrer le graphique"
+        self.current_chart = None
+        self._chart_panel = None
+
         self.setup_ui()
 
     def setup_ui(self):
@@ -135,6 +149,22 @@ class NBAStatsGUI:
                               highlightbackground='#FFFFFF', highlightthickness=1)
         btn_plot4.pack(fill=tk.X, pady=5)
 
+        # Enregistrer le graphique affiché en qualité finale (PNG 300 dpi, SVG, PDF)
+        btn_save_chart = tk.Button(left_frame, text="Enregistrer le graphique",
+                                   command=self.save_chart, bg='#000000', fg='#FFFFFF',
+                                   font=('Arial', 10, 'bold'), cursor='hand2',
+                                   relief=tk.FLAT, padx=20, pady=10,
+                                   highlightbackground='#FFFFFF', highlightthickness=1)
+        btn_save_chart.pack(fill=tk.X, pady=5)
+
+        # Annuler les tâches en arrière-plan (récupération, graphiques...)
+        btn_cancel = tk.Button(left_frame, text="Annuler la tâche en cours",
+                               command=self.cancel_tasks, bg='#000000', fg='#FFFFFF',
+                               font=('Arial', 10, 'bold'), cursor='hand2',
+                               relief=tk.FLAT, padx=20, pady=10,
+                               highlightbackground='#FFFFFF', highlightthickness=1)
+        btn_cancel.pack(fill=tk.X, pady=(20, 5))
+
         # Partie droite pour afficher les résultats
         right_frame = ttk.Frame(main_container)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -143,9 +173,13 @@ class NBAStatsGUI:
                                   font=('Arial', 14, 'bold'))
         results_label.pack(pady=(0, 10))
 
+        # Onglets : résultats texte et graphique intégré
+        self.notebook = ttk.Notebook(right_frame)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
         # Zone de texte avec barre de défilement
-        text_frame = ttk.Frame(right_frame)
-        text_frame.pack(fill=tk.BOTH, expand=True)
+        text_frame = ttk.Frame(self.notebook)
+        self.notebook.add(text_frame, text="Texte")
 
         scrollbar = ttk.Scrollbar(text_frame)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -158,10 +192,23 @@ class NBAStatsGUI:
         self.text_output.pack(fill=tk.BOTH, expand=True)
         scrollbar.config(command=self.text_output.yview)
 
+        # Graphique intégré : la même figure est réutilisée d'une vue à l'autre
+        self.chart_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.chart_frame, text="Graphique")
+
         # Message au démarrage
         self.print_output("Bienvenue dans NBA Stats Manager !\n\n"
                           "Cliquez sur '📥 Récupérer les données NBA' pour commencer.\n")
 
+    @property
+    def chart_panel(self):
+        """Panneau graphique, créé au premier graphique affiché"""
+        if self._chart_panel is None:
+            from chart_panel import ChartPanel
+            self._chart_panel = ChartPanel(self.chart_frame)
+            self._chart_panel.widget.pack(fill=tk.BOTH, expand=True)
+        return self._chart_panel
+
     def print_output(self, text):
         """Ajoute du texte dans la zone de résultats"""
         self.text_output.insert(tk.END, text + "\n")
@@ -171,25 +218,67 @@ class NBAStatsGUI:
         """Vide complètement la zone de résultats"""
         self.text_output.delete(1.0, tk.END)
 
+    def cancel_tasks(self):
+        """Annule les tâches en arrière-plan encore en cours"""
+        if not self.tasks.running:
+            self.print_output("Aucune tâche en cours")
+            return
+        self.tasks.cancel_all()
+        self.print_output("⏹ Annulation demandée")
+
+    def run_task(self, name, func, on_done):
+        """Lance func(task) dans un thread de travail, erreurs affichées dans la fenêtre"""
+        if self.tasks.is_running(name):
+            self.print_output("⏳ Tâche déjà en cours, patientez...")
+            return
+
+        def on_error(e):
+            self.print_output(f"✗ Erreur: {str(e)}")
+            messagebox.showerror("Erreur", str(e))
+
+        self.tasks.submit(name, func, on_done=on_done, on_error=on_error,
+                          on_progress=self.print_output)
+
     def fetch_data(self):
         """Récupère les stats depuis l'API NBA"""
         self.clear_output()
         self.print_output("📥 Récupération des données NBA en cours...")
-        self.root.update()
 
-        try:
-            scraper = NBAStatsScraper(season="2024-25")
-            players_data = scraper.fetch_league_leaders()
-            if players_data:
-                self.db.insert_players(players_data)
-                self.print_output(f"✓ {len(players_data)} joueurs récupérés et stockés")
-                messagebox.showinfo("Succès", "Données récupérées avec succès !")
-            else:
-                self.print_output("✗ Erreur lors de la récupération")
-                messagebox.showerror("Erreur", "Impossible de récupérer les données")
-        except Exception as e:
-            self.print_output(f"✗ Erreur: {str(e)}")
-            messagebox.showerror("Erreur", str(e))
+        def job(task):
+            if self.scraper is None:
+                from scraper import NBAStatsScraper
+                self.scraper = NBAStatsScraper(season="2024-25")
+            scraper = self.scraper
+            players_data = scraper.fetch_league_leaders(as_frame=True)
+            if players_data.empty:
+                raise RuntimeError("Impossible de récupérer les données")
+            # on n'écrit rien en base si l'utilisateur a annulé pendant l'appel réseau
+            task.check_cancelled()
+            task.report(f"💾 Enregistrement de {len(players_data)} joueurs...")
+            self.db.insert_players(players_data)
+            # joueurs enregistrés : une annulation ne fait plus que sauter le classement
+            task.mark_committed()
+            if task.cancelled:
+                return len(players_data), False, scraper.cache.report()
+
+            task.report("📥 Récupération du classement des équipes...")
+            standings = scraper.fetch_standings()
+            if task.cancelled:
+                return len(players_data), False, scraper.cache.report()
+            if not standings.empty:
+                self.db.insert_teams(standings)
+            return len(players_data), True, scraper.cache.report()
+
+        def on_done(result):
+            count, with_standings, cache = result
+            self.print_output(f"✓ {count} joueurs récupérés et stockés")
+            if not with_standings:
+                self.print_output("⏹ Classement des équipes annulé")
+            self.print_output(f"Cache API : {cache['hits']} hit(s), {cache['misses']} miss(es) "
+                              f"({cache['hit_rate']:.0%}) depuis l'ouverture")
+            messagebox.showinfo("Succès", "Données récupérées avec succès !")
+
+        self.run_task('fetch', job, on_done)
 
     def show_top_scorers(self):
         """Affiche le classement des 10 meilleurs scoreurs"""
@@ -232,6 +321,10 @@ class NBAStatsGUI:
                                   f"{row['rebounds_per_game']:.1f} RPG  "
                                   f"{row['assists_per_game']:.1f} APG")
             self.print_output("=" * 70)
+
+            summary = self.db.get_team_summaries(team_name=df['team_name'].iloc[0])
+            if not summary.empty:
+                self.print_output(format_team_summary(summary.iloc[0]))
         except Exception as e:
             messagebox.showerror("Erreur", str(e))
 
@@ -246,11 +339,8 @@ class NBAStatsGUI:
 
         self.clear_output()
         try:
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, self.db.conn)
-
-            p1 = df[df['player_name'].str.contains(player1, case=False)]
-            p2 = df[df['player_name'].str.contains(player2, case=False)]
+            p1 = self.db.search_players(player1, limit=1)
+            p2 = self.db.search_players(player2, limit=1)
 
             if p1.empty or p2.empty:
                 self.print_output("✗ Un ou plusieurs joueurs non trouvés")
@@ -275,33 +365,80 @@ class NBAStatsGUI:
             messagebox.showerror("Erreur", str(e))
 
     def export_csv(self):
-        """Exporte toute la base de données dans un fichier CSV"""
+        """Exporte toute la base de données (CSV, CSV gzip ou JSON Lines selon l'extension)"""
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("CSV gzip", "*.csv.gz"),
+                       ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
         )
         if filename:
-            try:
-                self.db.export_to_csv(filename)
+            def on_done(_):
                 self.print_output(f"✓ Données exportées vers {filename}")
                 messagebox.showinfo("Succès", f"Fichier exporté : {filename}")
-            except Exception as e:
-                messagebox.showerror("Erreur", str(e))
 
-    def plot_top(self):
-        """Génère un graphique des top scoreurs"""
-        try:
-            df = self.db.get_top_scorers(10)
-            if df.empty:
-                messagebox.showwarning("Attention", "Aucune donnée disponible")
+            self.run_task('export', lambda task: self.db.export_players(filename), on_done)
+
+    def show_chart(self, name, load, draw):
+        """Charge les données en arrière-plan puis met à jour le graphique intégré"""
+
+        def on_done(data):
+            if data is None or getattr(data, 'empty', False):
+                self.print_output("✗ Aucune donnée pour ce graphique")
                 return
-            plot_top_scorers(df, 10)
-            self.print_output("✓ Graphique généré : top_scorers.png")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+            # draw met le panneau à jour et renvoie de quoi produire le fichier final
+            self.current_chart = draw(data)
+            self.notebook.select(self.chart_frame)
+
+        self.run_task(name, lambda task: load(), on_done)
+
+    def save_chart(self):
+        """Produit le fichier final (PNG 300 dpi, SVG ou PDF) du graphique affiché, en arrière-plan"""
+        if self.current_chart is None:
+            self.print_output("✗ Aucun graphique à enregistrer")
+            return
+
+        build, args, default_name = self.current_chart
+        filename = filedialog.asksaveasfilename(
+            initialfile=default_name,
+            defaultextension=".png",
+            filetypes=[("PNG 300 dpi", "*.png"), ("SVG (vectoriel)", "*.svg"),
+                       ("PDF (vectoriel)", "*.pdf")]
+        )
+        if not filename:
+            return
+        self.print_output(f"💾 Enregistrement du graphique {filename}...")
+
+        def job(task):
+            # mêmes données déjà rendues : le fichier est recopié depuis le cache
+            key = ChartCache.key(build, args, 'final')
+            if self.chart_cache.fetch(key, filename):
+                return filename
+            fig = build(*args)
+            if fig is None:
+                raise RuntimeError("Aucune donnée pour ce graphique")
+            task.check_cancelled()
+            save_figure(fig, filename, 'final')
+            self.chart_cache.store(key, filename)
+            return filename
+
+        self.run_task('save_chart', job,
+                      lambda path: self.print_output(f"✓ Graphique enregistré : {path}"))
+
+    def plot_top(self):
+        """Affiche le graphique des top scoreurs"""
+
+        def draw(df):
+            data = df.sort_values('points_per_game')
+            self.chart_panel.show_bars('Top 10 Scoreurs NBA', data['player_name'],
+                                       [('PPG', data['points_per_game'], '#1f77b4')],
+                                       xlabel='Points par match', horizontal=True,
+                                       value_labels=True)
+            return build_top_scorers, (df, 10), 'top_scorers.png'
+
+        self.show_chart('plot_top', lambda: self.db.get_top_scorers(10), draw)
 
     def plot_compare(self):
-        """Génère un graphique comparant deux joueurs"""
+        """Affiche un graphique comparant deux joueurs"""
         player1 = self.ask_input("Premier joueur", "Nom du premier joueur:")
         if not player1:
             return
@@ -309,37 +446,60 @@ class NBAStatsGUI:
         if not player2:
             return
 
-        try:
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, self.db.conn)
-            plot_player_comparison(df, player1, player2)
-            self.print_output(f"✓ Graphique généré : player_comparison.png")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+        def load():
+            p1 = self.db.search_players(player1, limit=1)
+            p2 = self.db.search_players(player2, limit=1)
+            return None if p1.empty or p2.empty else (p1, p2)
+
+        def draw(players):
+            p1, p2 = players[0].iloc[0], players[1].iloc[0]
+            columns = ['points_per_game', 'rebounds_per_game', 'assists_per_game',
+                       'steals_per_game', 'blocks_per_game']
+            self.chart_panel.show_bars('Comparaison de joueurs', ['PPG', 'RPG', 'APG', 'SPG', 'BPG'],
+                                       [(p1['player_name'], p1[columns], '#1f77b4'),
+                                        (p2['player_name'], p2[columns], '#ff7f0e')],
+                                       xlabel='Statistiques', ylabel='Valeur')
+            return build_player_comparison, players, 'player_comparison.png'
+
+        self.show_chart('plot_compare', load, draw)
 
     def plot_team(self):
-        """Génère un graphique analysant une équipe"""
+        """Affiche un graphique analysant une équipe"""
         team = self.ask_input("Nom de l'équipe", "Entrez le nom de l'équipe:")
         if not team:
             return
 
-        try:
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, self.db.conn)
-            plot_team_analysis(df, team)
-            self.print_output(f"✓ Graphique généré : team_analysis.png")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+        def draw(df):
+            data = df.sort_values('points_per_game', ascending=False).head(8)
+            self.chart_panel.show_bars(f"Analyse de l'équipe - {team}", data['player_name'],
+                                       [('PPG', data['points_per_game'], '#1f77b4'),
+                                        ('RPG', data['rebounds_per_game'], '#2ca02c'),
+                                        ('APG', data['assists_per_game'], '#ff7f0e')],
+                                       xlabel='Joueurs', ylabel='Statistiques')
+            return build_team_analysis, (df, team), 'team_analysis.png'
+
+        self.show_chart('plot_team', lambda: self.db.get_team_stats(team), draw)
 
     def plot_scatter(self):
-        """Génère un nuage de points pour l'efficacité"""
-        try:
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, self.db.conn)
-            plot_efficiency_scatter(df)
-            self.print_output("✓ Graphique généré : efficiency_scatter.png")
-        except Exception as e:
-            messagebox.showerror("Erreur", str(e))
+        """Affiche un nuage de points pour l'efficacité (agrégé si trop de joueurs)"""
+
+        def draw(df):
+            scatter = efficiency_scatter_data(df)
+            if scatter.aggregate:
+                self.chart_panel.show_density(scatter.title, scatter.counts, scatter.extent,
+                                              scatter.labels,
+                                              xlabel='Points par match',
+                                              ylabel="Score d'efficacité",
+                                              color_label=scatter.color_label)
+            else:
+                self.chart_panel.show_scatter(scatter.title, scatter.points, scatter.efficiency,
+                                              scatter.sizes, scatter.colors, scatter.labels,
+                                              xlabel='Points par match',
+                                              ylabel="Score d'efficacité",
+                                              color_label=scatter.color_label)
+            return build_efficiency_scatter, (df,), 'efficiency_scatter.png'
+
+        self.show_chart('plot_scatter', self.db.get_players_frame, draw)
 
     def ask_input(self, title, prompt):
         """Ouvre une petite fenêtre pour demander une info à l'utilisateur"""
@@ -386,6 +546,8 @@ class NBAStatsGUI:
     def run(self):
         """Lance l'application"""
         self.root.mainloop()
+        # les tâches encore en cours utilisent la base : elles se terminent avant sa fermeture
+        self.tasks.shutdown()
         self.db.close()
 
 
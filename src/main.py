@@ -1,11 +1,24 @@
+import argparse
+import contextlib
+import json
+import sqlite3
 import sys
+import time
 import pandas as pd
+from typing import Dict, List
 
-from src.database import NBADatabase
-from scraper import NBAStatsScraper
-from utils import display_stats_summary, compare_players, calculate_efficiency
+from database import NBADatabase, RANKABLE_METRICS, EXPORT_FORMATS
+from utils import display_stats_summary, compare_players, format_team_summary
 
 from visualizations import (plot_top_scorers, plot_player_comparison, plot_team_analysis, plot_efficiency_scatter, plot_shooting_percentages)
+from visualizations import (build_top_scorers, build_efficiency_scatter, build_shooting_percentages,
+                            QUALITY_TIERS, FILE_FORMATS)
+from rendering import (DEFAULT_OUTPUT_DIR, ChartCache, ChartJob, chart_inputs, resolve_job,
+                       render_figure, report_jobs, render_jobs, render_parallel)
+
+# Démarrage rapide : les modules lourds sont importés au premier usage. nba_api (scraper) et
+# scipy (similarity) dans les commandes qui en ont besoin ; matplotlib au premier graphique,
+# par visualizations et rendering.
 
 
 def print_menu():
@@ -24,28 +37,43 @@ def print_menu():
     print("9. Analyser une équipe (graphique)")
     print("10. Nuage de points efficacité")
     print("11. Pourcentages de tir")
+    print("12. Joueurs au profil similaire")
     print("0. Quitter")
     print("=" * 60)
 
-def main():
+def run_menu():
     print("\n🏀 NBA STATS MANAGER 🏀")
     print("Système de gestion de statistiques NBA\n")
 
     # Initialisation de la base de données
-    db = NBADatabase()
+    db = NBADatabase(snapshot_dir="snapshots")
     db.connect()
     db.create_tables()
 
+    # index de similarité construit au premier usage, puis tenu à jour par insert_players
+    similarity = None
+    # scraper créé au premier fetch et gardé pour la session (cache de l'API et ses compteurs)
+    scraper = None
+
     while True:
         print_menu()
         choice = input("\nVotre choix: ")
 
         if choice == "1":
             # recup des données
-            scraper = NBAStatsScraper(season="2024-25")
-            players_data = scraper.fetch_league_leaders()
-            if players_data:
-                db.insert_players(players_data)
+            if scraper is None:
+                from scraper import NBAStatsScraper
+                scraper = NBAStatsScraper(season="2024-25")
+            players_data = scraper.fetch_league_leaders(as_frame=True)
+            try:
+                if not players_data.empty:
+                    db.insert_players(players_data)
+                standings = scraper.fetch_standings()
+                if not standings.empty:
+                    db.insert_teams(standings)
+            except sqlite3.Error:
+                print("✗ Données non enregistrées")
+            scraper.cache.report()
 
         elif choice == "2":
             # Top scoreurs
@@ -58,72 +86,388 @@ def main():
             df = db.get_team_stats(team)
             if not df.empty:
                 display_stats_summary(df)
+                summary = db.get_team_summaries(team_name=df['team_name'].iloc[0])
+                if not summary.empty:
+                    print(format_team_summary(summary.iloc[0]))
             else:
                 print("✗ Aucun résultat trouvé")
 
         elif choice == "4":
-            # Export CSV
-            filename = input("Nom du fichier (défaut: nba_stats_export.csv): ")
+            # Export (CSV, CSV gzip ou JSON Lines selon l'extension, '-' pour la sortie standard)
+            filename = input("Nom du fichier .csv/.csv.gz/.jsonl (défaut: nba_stats_export.csv): ")
             if not filename:
                 filename = "nba_stats_export.csv"
-            db.export_to_csv(filename)
+            season = input("Saison (vide = toutes): ").strip() or None
+            db.export_players(filename, season=season)
 
         elif choice == "5":
             # Comparaison de joueurs
             player1 = input("Premier joueur: ")
             player2 = input("Deuxième joueur: ")
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, db.conn)
-            compare_players(df, player1, player2)
+            compare_players(db, player1, player2)
 
         elif choice == "6":
             # Calcul d'efficacité
-            query = "SELECT * FROM players WHERE games_played > 10"
-            df = pd.read_sql_query(query, db.conn)
-            df_efficiency = calculate_efficiency(df)
+            df_efficiency = db.get_ranked('efficiency', limit=10)
             print("\n🏆 TOP 10 JOUEURS LES PLUS EFFICACES")
-            display_stats_summary(df_efficiency.head(10))
+            display_stats_summary(df_efficiency)
 
         elif choice == "0":
             print("\nAu revoir!")
             db.close()
             sys.exit(0)
 
+        # les graphiques du menu s'affichent à l'écran : aperçu rapide, enregistré sous
+        # <graphique>_preview.png ; le rendu final passe par `main.py render` / `report`
         elif choice == "7":
             # Graphique top scoreurs
             df = db.get_top_scorers(10)
-            plot_top_scorers(df, 10)
+            plot_top_scorers(df, 10, quality='preview')
 
         elif choice == "8":
             # Comparaison graphique
             player1 = input("Premier joueur: ")
             player2 = input("Deuxième joueur: ")
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, db.conn)
-            plot_player_comparison(df, player1, player2)
+            plot_player_comparison(db.search_players(player1, limit=1),
+                                   db.search_players(player2, limit=1), quality='preview')
 
         elif choice == "9":
             # Analyse d'équipe
             team = input("Nom de l'équipe: ")
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, db.conn)
-            plot_team_analysis(df, team)
+            plot_team_analysis(db.get_team_stats(team), team, quality='preview')
 
         elif choice == "10":
             # Nuage de points
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, db.conn)
-            plot_efficiency_scatter(df)
+            plot_efficiency_scatter(db.get_players_frame(), quality='preview')
 
         elif choice == "11":
             # Pourcentages de tir
-            query = "SELECT * FROM players"
-            df = pd.read_sql_query(query, db.conn)
-            plot_shooting_percentages(df, 10)
+            plot_shooting_percentages(db.get_ranked('points_per_game', limit=10, min_games=15), 10,
+                                      quality='preview')
+
+        elif choice == "12":
+            # Joueurs similaires
+            player = input("Joueur: ")
+            if similarity is None:
+                from similarity import PlayerSimilarity
+                similarity = PlayerSimilarity(db)
+            df = similarity.most_similar_to(player, 5)
+            if not df.empty:
+                display_stats_summary(df)
+            else:
+                print("✗ Joueur non trouvé")
 
         else:
             print("✗ Choix invalide")
 
 
+# ---------------------------------------------------------------------------
+# Mode batch (sans input()) : une ou plusieurs opérations séparées par "+",
+# exécutées dans le même processus avec une seule connexion et un seul DataFrame
+#
+#   python main.py fetch + top --limit 5 + export nuit.csv.gz --season 2024-25
+#   python main.py --json team LAL + compare "Jokic" "Embiid"
+# ---------------------------------------------------------------------------
+
+SEPARATOR = '+'
+
+# graphiques disponibles pour "render" et fichier produit par défaut
+CHARTS = {
+    'top-scorers': 'top_scorers.png',
+    'comparison': 'player_comparison.png',
+    'team': 'team_analysis.png',
+    'scatter': 'efficiency_scatter.png',
+    'shooting': 'shooting_percentages.png',
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+
+    parser = argparse.ArgumentParser(
+        prog='main.py',
+        description="NBA Stats Manager. Sans argument : menu interactif. "
+                    f"Plusieurs opérations peuvent être enchaînées avec '{SEPARATOR}'.")
+    parser.add_argument('--db', default='nba_stats.db', help="fichier de la base SQLite")
+    parser.add_argument('--snapshot-dir', default='snapshots',
+                        help="dossier de l'instantané colonne (chargement rapide)")
+    parser.add_argument('--json', action='store_true',
+                        help="résultats en JSON sur stdout (messages sur stderr)")
+    parser.add_argument('--chart-cache', default='chart_cache',
+                        help="dossier du cache d'images (render, report)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="toujours redessiner les graphiques")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fetch = commands.add_parser('fetch', help="récupérer joueurs et classements depuis l'API NBA")
+    fetch.add_argument('--season', default='2024-25')
+
+    top = commands.add_parser('top', help="meilleurs joueurs (points par défaut)")
+    top.add_argument('--limit', type=int, default=10)
+    top.add_argument('--season')
+    top.add_argument('--stat', choices=RANKABLE_METRICS,
+                     help="classer sur une autre statistique")
+
+    team = commands.add_parser('team', help="joueurs et résumé d'une équipe")
+    team.add_argument('name')
+
+    export = commands.add_parser('export', help="export en flux (CSV, CSV gzip, JSON Lines)")
+    export.add_argument('target', help="fichier de sortie, '-' pour stdout")
+    export.add_argument('--format', choices=EXPORT_FORMATS)
+    export.add_argument('--season')
+    export.add_argument('--team')
+    export.add_argument('--min-games', type=int)
+
+    compare = commands.add_parser('compare', help="comparer deux joueurs")
+    compare.add_argument('player1')
+    compare.add_argument('player2')
+
+    render = commands.add_parser('render', help="générer un graphique sans l'afficher")
+    render.add_argument('chart', choices=list(CHARTS))
+    render.add_argument('-o', '--output',
+                        help="fichier image .png/.svg/.pdf (défaut selon le graphique)")
+    render.add_argument('--quality', choices=list(QUALITY_TIERS), default='final',
+                        help="preview : rapide, basse résolution ; final : impression")
+    render.add_argument('--limit', type=int, default=10)
+    render.add_argument('--team', help="équipe (graphique team)")
+    render.add_argument('--players', nargs=2, metavar='JOUEUR',
+                        help="deux joueurs (graphique comparison)")
+
+    report = commands.add_parser('report', help="rapport complet sans affichage : une analyse "
+                                                "par équipe + classements")
+    report.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR)
+    report.add_argument('--season', help="saison (défaut: la plus récente)")
+    report.add_argument('--limit', type=int, default=10)
+    report.add_argument('--teams', nargs='+', metavar='EQUIPE',
+                        help="limiter le rapport à ces équipes")
+    report.add_argument('--quality', choices=list(QUALITY_TIERS), default='final')
+    report.add_argument('--format', choices=FILE_FORMATS, default='png')
+    report.add_argument('--workers', type=int, default=1,
+                        help="processus de rendu en parallèle (0 = un par cœur)")
+
+    return parser
+
+
+# découpe la ligne de commande en opérations : ["top", "+", "team", "LAL"] -> [["top"], ["team", "LAL"]]
+def split_operations(argv: List[str]) -> List[List[str]]:
+
+    operations = [[]]
+    for arg in argv:
+        if arg == SEPARATOR:
+            operations.append([])
+        else:
+            operations[-1].append(arg)
+    return [op for op in operations if op]
+
+
+# les méthodes du scraper renvoient un résultat vide quand l'API échoue : la commande échoue
+# alors aussi (code retour 1), pour qu'un job planifié ne passe pas pour réussi
+def cmd_fetch(db: NBADatabase, args) -> Dict:
+
+    scraper = args.scraper
+    players = scraper.fetch_league_leaders(args.season, as_frame=True)
+    if players.empty:
+        raise RuntimeError(f"aucun joueur récupéré pour {args.season} (API injoignable ?)")
+    db.insert_players(players)
+    standings = scraper.fetch_standings(args.season)
+    if standings.empty:
+        raise RuntimeError(f"classement {args.season} non récupéré "
+                           f"({len(players)} joueurs enregistrés)")
+    db.insert_teams(standings)
+    # hits / miss du cache de l'API, cumulés sur tous les fetch du lot
+    return {'season': args.season, 'players': len(players), 'teams': len(standings),
+            'cache': scraper.cache.report()}
+
+
+def cmd_top(db: NBADatabase, args) -> Dict:
+
+    if args.stat:
+        rows = db.get_ranked(args.stat, args.season, limit=args.limit)
+    else:
+        rows = db.get_top_scorers(args.limit, args.season)
+    return {'rows': rows}
+
+
+def cmd_team(db: NBADatabase, args) -> Dict:
+
+    rows = db.get_team_stats(args.name)
+    result = {'rows': rows}
+    if not rows.empty:
+        summary = db.get_team_summaries(team_name=rows['team_name'].iloc[0])
+        if not summary.empty:
+            result['summary'] = summary.iloc[0]
+    return result
+
+
+def cmd_export(db: NBADatabase, args) -> Dict:
+
+    count = db.export_players(args.target, fmt=args.format, season=args.season,
+                              team=args.team, min_games=args.min_games, stream=args.stdout)
+    return {'target': args.target, 'rows_written': count}
+
+
+def cmd_compare(db: NBADatabase, args) -> Dict:
+
+    found = [db.search_players(name, limit=1) for name in (args.player1, args.player2)]
+    missing = [name for name, df in zip((args.player1, args.player2), found) if df.empty]
+    if missing:
+        raise ValueError(f"joueur(s) non trouvé(s) : {', '.join(missing)}")
+    return {'rows': pd.concat(found, ignore_index=True)}
+
+
+# les build_* ne passent pas par pyplot : aucun affichage n'est nécessaire
+def cmd_render(db: NBADatabase, args) -> Dict:
+
+    if args.chart == 'top-scorers':
+        build, chart_args = build_top_scorers, (db.get_top_scorers(args.limit), args.limit)
+    elif args.chart == 'comparison':
+        if not args.players:
+            raise ValueError("render comparison demande --players JOUEUR1 JOUEUR2")
+        # même résolution des noms que report et les processus de rendu
+        job = resolve_job(db, ChartJob('comparison', {'player1': args.players[0],
+                                                      'player2': args.players[1]}))
+        build, chart_args = chart_inputs(db.get_players_frame(), job)
+    elif args.chart == 'team':
+        if not args.team:
+            raise ValueError("render team demande --team EQUIPE")
+        job = resolve_job(db, ChartJob('team', {'team': args.team}))
+        build, chart_args = chart_inputs(db.get_players_frame(), job)
+    elif args.chart == 'scatter':
+        build, chart_args = build_efficiency_scatter, (db.get_players_frame(),)
+    else:
+        build, chart_args = build_shooting_percentages, (
+            db.get_ranked('points_per_game', limit=args.limit, min_games=15), args.limit)
+
+    filename = render_figure(build, chart_args, args.output or CHARTS[args.chart], args.cache,
+                             args.quality)
+    return {'chart': args.chart, 'file': filename}
+
+
+# les données viennent du DataFrame partagé (une seule lecture pour tous les graphiques)
+def cmd_report(db: NBADatabase, args) -> Dict:
+
+    frame = db.get_players_frame()
+    jobs = [job._replace(quality=args.quality, fmt=args.format)
+            for job in report_jobs(frame, args.season, args.limit)]
+    if args.teams:
+        wanted = {db.resolve_team(team) or team for team in args.teams}
+        jobs = [job for job in jobs if job.chart != 'team' or job.params['team'] in wanted]
+    if args.workers == 1 or db.snapshot_dir is None:
+        results = render_jobs(frame, jobs, args.output_dir, args.cache)
+    else:
+        # get_players_frame() vient de remettre l'instantané à jour : les processus le chargent
+        results = render_parallel(db.snapshot_dir, jobs, args.output_dir, args.workers or None,
+                                  args.cache.cache_dir if args.cache else None)
+    results = pd.DataFrame(results)
+    return {'jobs': results[['chart', 'file', 'elapsed_s', 'error']]}
+
+
+COMMANDS = {
+    'fetch': cmd_fetch,
+    'top': cmd_top,
+    'team': cmd_team,
+    'export': cmd_export,
+    'compare': cmd_compare,
+    'render': cmd_render,
+    'report': cmd_report,
+}
+
+
+# DataFrame / Series -> types JSON (NaN -> null, types NumPy -> natifs)
+def _to_json(value):
+    if isinstance(value, pd.DataFrame):
+        return json.loads(value.to_json(orient='records'))
+    if isinstance(value, pd.Series):
+        return json.loads(value.to_json())
+    return value
+
+
+def _print_result(command: str, result: Dict):
+    for key, value in result.items():
+        if isinstance(value, pd.DataFrame):
+            if value.empty:
+                print("✗ Aucun résultat trouvé")
+            else:
+                display_stats_summary(value)
+        elif isinstance(value, pd.Series):
+            # seule Series renvoyée : la ligne de get_team_summaries
+            print(format_team_summary(value))
+    if not any(isinstance(v, (pd.DataFrame, pd.Series)) for v in result.values()):
+        # les dicts (stats du cache) sont déjà affichés sur une ligne par leur report()
+        print(f"✓ {command}: " + ", ".join(f"{k}={v}" for k, v in result.items()
+                                          if not isinstance(v, dict)))
+
+
+# exécute les opérations dans l'ordre et s'arrête à la première erreur (code retour 1)
+def run_batch(argv: List[str]) -> int:
+
+    parser = build_parser()
+    operations = split_operations(argv)
+    # les options globales valent pour tout le lot : elles se placent avant la première opération
+    misplaced = [op[0] for op in operations[1:] if op[0].startswith('-')]
+    if misplaced:
+        parser.error(f"option(s) globale(s) après '{SEPARATOR}' : {', '.join(misplaced)} ; "
+                     "les placer avant la première opération")
+    # tout est validé avant de toucher à la base : une faute de frappe ne laisse pas un job à moitié fait
+    parsed = [parser.parse_args(op) for op in operations]
+    options = parsed[0]
+
+    # un seul cache d'images pour toutes les opérations (créé seulement s'il y a des graphiques)
+    draws = any(args.command in ('render', 'report') for args in parsed)
+    cache = ChartCache(options.chart_cache) if draws and not options.no_cache else None
+    # `export -` écrit les données sur la vraie sortie standard, gardée avant la redirection
+    to_stdout = any(args.command == 'export' and args.target == '-' for args in parsed)
+    if to_stdout and options.json:
+        parser.error("--json et `export -` écrivent tous deux sur stdout : exporter vers un fichier")
+    # un seul scraper (et donc un seul cache de l'API et ses compteurs) pour tous les fetch
+    scraper = None
+    if any(args.command == 'fetch' for args in parsed):
+        from scraper import NBAStatsScraper
+        scraper = NBAStatsScraper()
+    for args in parsed:
+        args.cache = cache
+        args.scraper = scraper
+        args.stdout = sys.stdout
+
+    results = []
+    status = 0
+    # en mode JSON, ou quand stdout reçoit des données exportées, les messages (✓/✗) partent
+    # sur stderr : stdout ne contient que le JSON ou les données
+    messages = sys.stderr if options.json or to_stdout else sys.stdout
+    with contextlib.redirect_stdout(messages):
+        db = NBADatabase(options.db, snapshot_dir=options.snapshot_dir)
+        db.connect()
+        db.create_tables()
+        try:
+            for args in parsed:
+                start = time.perf_counter()
+                try:
+                    result = COMMANDS[args.command](db, args)
+                except Exception as e:
+                    print(f"✗ {args.command}: {e}")
+                    results.append({'command': args.command, 'error': str(e)})
+                    status = 1
+                    break
+                elapsed = round(time.perf_counter() - start, 3)
+                if not options.json:
+                    _print_result(args.command, result)
+                results.append({'command': args.command, 'elapsed_s': elapsed,
+                                **{k: _to_json(v) for k, v in result.items()}})
+        finally:
+            db.close()
+
+    if options.json:
+        json.dump({'operations': results, 'status': status}, sys.stdout,
+                  ensure_ascii=False, indent=2)
+        print()
+    return status
+
+
+def main(argv: List[str] = None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        sys.exit(run_batch(argv))
+    run_menu()
+
+
 if __name__ == "__main__":
     main()
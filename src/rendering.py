@@ -0,0 +1,356 @@
+import contextlib
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, TYPE_CHECKING
+
+from disk_cache import cache_entries, evict_lru
+from snapshot import load_snapshot
+from visualizations import (build_top_scorers, build_player_comparison, build_team_analysis,
+                            build_efficiency_scatter, build_shooting_percentages, save_figure)
+
+# matplotlib (canvas Agg) n'est importé qu'au premier rendu
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+# Rendu sans affichage : une liste de graphiques (ChartJob) est rendue dans un dossier de sortie.
+# Les données de chaque graphique sont extraites du DataFrame players (get_players_frame ou
+# instantané), sans requête SQL par graphique. Les figures sont des Figure matplotlib liées à
+# un canvas Agg : pas de pyplot, pas de fenêtre, et rien ne reste en mémoire après le rendu.
+
+DEFAULT_OUTPUT_DIR = "charts"
+# à incrémenter quand l'apparence des graphiques change : les anciennes images ne sont plus reprises
+CHART_CACHE_VERSION = 1
+
+
+# un graphique à produire : type (clé de CHARTS), paramètres, nom de fichier (optionnel),
+# qualité (clé de QUALITY_TIERS) et format du fichier quand le nom n'est pas donné
+class ChartJob(NamedTuple):
+    chart: str
+    params: Optional[Dict] = None
+    filename: Optional[str] = None
+    quality: str = 'final'
+    fmt: str = 'png'
+
+    # nom par défaut : type + valeurs des paramètres, ex. team_LAL_2024-25.png
+    def output_name(self) -> str:
+        if self.filename:
+            return self.filename
+        parts = [self.chart] + [str(value).replace(' ', '_')
+                                for value in (self.params or {}).values() if value is not None]
+        return '_'.join(parts) + '.' + self.fmt
+
+
+def _season_rows(frame: pd.DataFrame, season: Optional[str]) -> pd.DataFrame:
+    return frame if season is None else frame[frame['season'] == season]
+
+
+# lignes d'un joueur pour une clé (player_id, season) résolue par resolve_job
+def _player_rows(frame: pd.DataFrame, key: Optional[Tuple[int, str]]) -> pd.DataFrame:
+    if key is None:
+        return frame.iloc[0:0]
+    player_id, season = key
+    return frame[(frame['player_id'] == player_id) & (frame['season'] == season)]
+
+
+# mêmes sélections que les requêtes de NBADatabase utilisées par main.py.
+# Chaque sélection renvoie (fonction build_*, arguments) : les arguments sont exactement
+# les données du graphique, ce qui sert aussi de clé au cache des images (ChartCache).
+# Joueurs et équipe sont des valeurs exactes (voir resolve_job), jamais une saisie libre
+def _top_scorers(frame, limit=10, season=None):
+    rows = _season_rows(frame, season)
+    return build_top_scorers, (rows[rows['games_played'] > 10].nlargest(limit, 'points_per_game'),
+                               limit)
+
+
+def _comparison(frame, player1, player2):
+    return build_player_comparison, (_player_rows(frame, player1), _player_rows(frame, player2))
+
+
+def _team(frame, team, season=None):
+    rows = _season_rows(frame, season)
+    return build_team_analysis, (rows[rows['team_name'] == team], team)
+
+
+def _scatter(frame, season=None):
+    return build_efficiency_scatter, (_season_rows(frame, season),)
+
+
+def _shooting(frame, limit=10, season=None):
+    return build_shooting_percentages, (_season_rows(frame, season), limit)
+
+
+CHARTS: Dict[str, Callable[..., Tuple[Callable[..., Optional['Figure']], tuple]]] = {
+    'top-scorers': _top_scorers,
+    'comparison': _comparison,
+    'team': _team,
+    'scatter': _scatter,
+    'shooting': _shooting,
+}
+
+
+# remplace les noms saisis (joueurs, équipe) par les valeurs exactes trouvées par les
+# recherches de NBADatabase (plein texte, nom complet d'équipe...) : une saisie donne les
+# mêmes lignes qu'avec main.py compare / team. Le nom de fichier garde la saisie d'origine
+def resolve_job(db, job: ChartJob) -> ChartJob:
+
+    params = dict(job.params or {})
+    if job.chart == 'comparison':
+        for key in ('player1', 'player2'):
+            params[key] = db.resolve_player(params[key])
+    elif job.chart == 'team':
+        params['team'] = db.resolve_team(params['team']) or params['team']
+    return job._replace(params=params, filename=job.output_name())
+
+
+def chart_inputs(frame: pd.DataFrame, job: ChartJob) -> Tuple[Callable[..., Optional['Figure']], tuple]:
+    if job.chart not in CHARTS:
+        raise ValueError(f"Graphique inconnu: {job.chart} (possibles: {', '.join(CHARTS)})")
+    return CHARTS[job.chart](frame, **(job.params or {}))
+
+
+def build_chart(frame: pd.DataFrame, job: ChartJob) -> Optional['Figure']:
+    build, args = chart_inputs(frame, job)
+    return build(*args)
+
+
+def _is_chart_entry(name: str) -> bool:
+    return not name.endswith('.tmp')
+
+
+# cache d'images adressé par contenu : la clé est un hash du graphique, de ses paramètres et
+# des lignes de données utilisées. Même données + mêmes paramètres = même image, on recopie
+# le fichier au lieu de relancer matplotlib. Éviction par âge (dernier usage) puis par taille (LRU)
+class ChartCache:
+
+    def __init__(self, cache_dir: str = "chart_cache", max_size_mb: float = 200,
+                 max_age_days: float = 30):
+
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    # hash des données (valeurs, colonnes, types), des paramètres du graphique et de la qualité
+    # (le format fait partie du nom de fichier en cache)
+    @staticmethod
+    def key(build: Callable, args: tuple, quality: str = 'final') -> str:
+
+        digest = hashlib.sha1()
+        digest.update(f"v{CHART_CACHE_VERSION}:{build.__name__}:{quality}".encode('utf-8'))
+        for arg in args:
+            if isinstance(arg, pd.DataFrame):
+                digest.update(json.dumps([list(map(str, arg.columns)),
+                                          list(map(str, arg.dtypes))]).encode('utf-8'))
+                digest.update(pd.util.hash_pandas_object(arg, index=False).to_numpy().tobytes())
+            else:
+                digest.update(json.dumps(arg, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+
+    # copie l'image en cache vers destination ; False si absente ou trop ancienne
+    def fetch(self, key: str, destination: str) -> bool:
+
+        path = self._path(key, os.path.splitext(destination)[1])
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            if age > self.max_age:
+                raise FileNotFoundError(path)
+            if os.path.abspath(path) != os.path.abspath(destination):
+                shutil.copyfile(path, destination)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return False
+
+        # date de dernier usage, pour l'éviction
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return True
+
+    # garde une copie d'une image tout juste rendue
+    def store(self, key: str, source: str):
+
+        path = self._path(key, os.path.splitext(source)[1])
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    # images les moins récemment utilisées au-delà de la taille max, et images trop anciennes
+    def _evict(self):
+        with self._lock:
+            self.evictions += evict_lru(self.cache_dir, self.max_size_bytes, _is_chart_entry,
+                                        self.max_age)
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            os.remove(os.path.join(self.cache_dir, name))
+
+    # stats du cache (hits / miss / taux)
+    def report(self) -> Dict:
+
+        total = self.hits + self.misses
+        entries = cache_entries(self.cache_dir, _is_chart_entry)
+        stats = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+        }
+        print(f"Cache graphiques : {stats['hits']} hit(s), {stats['misses']} miss(es) "
+              f"({stats['hit_rate']:.0%}), {stats['entries']} images, "
+              f"{stats['size_bytes'] / 1024 / 1024:.1f} Mo")
+        return stats
+
+
+# build(*args) enregistré dans path ; avec un cache, une image identique est simplement recopiée
+def render_figure(build: Callable[..., Optional['Figure']], args: tuple, path: str,
+                  cache: Optional[ChartCache] = None, quality: str = 'final') -> str:
+
+    key = ChartCache.key(build, args, quality) if cache else None
+    if cache and cache.fetch(key, path):
+        print(f"✓ Graphique (cache): {path}")
+        return path
+
+    fig = build(*args)
+    if fig is None:
+        raise ValueError(f"Aucune donnée pour {os.path.basename(path)}")
+
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    FigureCanvasAgg(fig)
+    try:
+        save_figure(fig, path, quality)
+    finally:
+        # libère les artistes tout de suite : des centaines de rendus gardent une mémoire stable
+        fig.clear()
+
+    if cache:
+        cache.store(key, path)
+    return path
+
+
+# rend un graphique dans output_dir et renvoie le chemin du fichier
+def render_job(frame: pd.DataFrame, job: ChartJob, output_dir: str = DEFAULT_OUTPUT_DIR,
+               cache: Optional[ChartCache] = None) -> str:
+
+    build, args = chart_inputs(frame, job)
+    return render_figure(build, args, os.path.join(output_dir, job.output_name()), cache,
+                         job.quality)
+
+
+# rend un graphique et renvoie sa ligne de résultat (fichier, durée, erreur éventuelle)
+def _render_result(frame: pd.DataFrame, job: ChartJob, output_dir: str,
+                   cache: Optional[ChartCache]) -> Dict:
+
+    start = time.perf_counter()
+    result = {'chart': job.chart, 'params': job.params, 'file': None, 'error': None,
+              'worker': os.getpid()}
+    try:
+        result['file'] = render_job(frame, job, output_dir, cache)
+    except Exception as e:
+        result['error'] = str(e)
+        print(f"✗ {job.output_name()}: {e}")
+    result['elapsed_s'] = round(time.perf_counter() - start, 3)
+    return result
+
+
+# rend tous les graphiques ; un échec n'arrête pas les suivants.
+# Retourne une ligne par graphique : fichier, durée, erreur éventuelle
+def render_jobs(frame: pd.DataFrame, jobs: List[ChartJob], output_dir: str = DEFAULT_OUTPUT_DIR,
+                cache: Optional[ChartCache] = None,
+                on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+
+    os.makedirs(output_dir, exist_ok=True)
+    results = []
+    for done, job in enumerate(jobs, start=1):
+        results.append(_render_result(frame, job, output_dir, cache))
+        if on_progress:
+            on_progress(done, len(jobs))
+    return results
+
+
+# --- rendu parallèle ----------------------------------------------------------------------
+# matplotlib à 300 dpi est limité par le CPU : les graphiques sont répartis sur des processus.
+# Chaque processus charge l'instantané colonne (snapshot.py) une seule fois à son démarrage :
+# les fichiers .npy sont lus par mmap depuis le cache disque du système, commun à tous les
+# processus, et seuls les ChartJob (quelques octets) transitent par pickle, jamais le DataFrame.
+
+_worker_frame = None
+_worker_cache = None
+
+
+def _init_worker(snapshot_dir: str, cache_dir: Optional[str]):
+    global _worker_frame, _worker_cache
+    _worker_frame = load_snapshot(snapshot_dir)
+    _worker_cache = ChartCache(cache_dir) if cache_dir else None
+
+
+def _render_in_worker(job: ChartJob, output_dir: str) -> Dict:
+    # les messages ✓ de chaque graphique resteraient mélangés entre processus : seul le résultat compte
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _render_result(_worker_frame, job, output_dir, _worker_cache)
+
+
+# même résultat que render_jobs (dans l'ordre des jobs), calculé par max_workers processus
+def render_parallel(snapshot_dir: str, jobs: List[ChartJob], output_dir: str = DEFAULT_OUTPUT_DIR,
+                    max_workers: Optional[int] = None, cache_dir: Optional[str] = None,
+                    on_progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+
+    os.makedirs(output_dir, exist_ok=True)
+    max_workers = max_workers or os.cpu_count() or 1
+    results = [None] * len(jobs)
+
+    # spawn : pas de fork d'un processus qui a déjà des threads (GUI, pool SQLite)
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                             initializer=_init_worker,
+                             initargs=(snapshot_dir, cache_dir)) as executor:
+        futures = {executor.submit(_render_in_worker, job, output_dir): i
+                   for i, job in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                # processus perdu (mémoire, crash) : le job est compté comme échoué
+                job = jobs[i]
+                results[i] = {'chart': job.chart, 'params': job.params, 'file': None,
+                              'error': str(e) or type(e).__name__, 'worker': None,
+                              'elapsed_s': None}
+            if results[i]['error']:
+                print(f"✗ {jobs[i].output_name()}: {results[i]['error']}")
+            if on_progress:
+                on_progress(done, len(jobs))
+
+    return results
+
+
+# analyse de chaque équipe de la saison + classements (rapport complet)
+def report_jobs(frame: pd.DataFrame, season: Optional[str] = None, limit: int = 10) -> List[ChartJob]:
+
+    season = season or frame['season'].max()
+    teams = sorted(_season_rows(frame, season)['team_name'].dropna().unique())
+    jobs = [ChartJob('team', {'team': team, 'season': season}) for team in teams]
+    jobs += [
+        ChartJob('top-scorers', {'limit': limit, 'season': season}),
+        ChartJob('shooting', {'limit': limit, 'season': season}),
+        ChartJob('scatter', {'season': season}),
+    ]
+    return jobs
@@ -1,56 +1,383 @@
-from nba_api.stats.endpoints import leagueleaders
+from nba_api.stats.endpoints import leagueleaders, playergamelogs, leaguestandingsv3
 from nba_api.stats.static import teams
+import pandas as pd
+import datetime
+import hashlib
+import json
+import os
+import threading
 import time
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Callable, Iterable, Union
+
+from disk_cache import cache_entries, evict_lru
+
+# Hôte derrière tous les endpoints de nba_api
+NBA_STATS_HOST = "stats.nba.com"
+
+# colonnes de LeagueLeaders -> clés utilisées par le reste du projet
+LEADERS_COLUMNS = {
+    'PLAYER_ID': 'player_id',
+    'PLAYER': 'player_name',
+    'TEAM': 'team_name',
+    'POSITION': 'position',
+    'GP': 'games_played',
+    'PTS': 'ppg',
+    'REB': 'rpg',
+    'AST': 'apg',
+    'STL': 'spg',
+    'BLK': 'bpg',
+    'FG_PCT': 'fg_pct',
+    'FG3_PCT': 'three_pct',
+    'FT_PCT': 'ft_pct',
+}
+LEADERS_STATS = ['ppg', 'rpg', 'apg', 'spg', 'bpg']
+LEADERS_PCTS = ['fg_pct', 'three_pct', 'ft_pct']
+
+# colonnes de PlayerGameLogs -> colonnes de la table game_logs (stats entières d'un match)
+GAME_LOG_COLUMNS = {
+    'PLAYER_ID': 'player_id',
+    'GAME_ID': 'game_id',
+    'GAME_DATE': 'game_date',
+    'TEAM_ABBREVIATION': 'team_name',
+    'MATCHUP': 'matchup',
+    'WL': 'win',
+    'MIN': 'minutes',
+    'PTS': 'pts',
+    'REB': 'reb',
+    'AST': 'ast',
+    'STL': 'stl',
+    'BLK': 'blk',
+    'TOV': 'tov',
+    'FGM': 'fgm',
+    'FGA': 'fga',
+    'FG3M': 'fg3m',
+    'FG3A': 'fg3a',
+    'FTM': 'ftm',
+    'FTA': 'fta',
+    'PLUS_MINUS': 'plus_minus',
+}
+GAME_LOG_COUNTS = ['pts', 'reb', 'ast', 'stl', 'blk', 'tov',
+                   'fgm', 'fga', 'fg3m', 'fg3a', 'ftm', 'fta', 'plus_minus']
+
+
+# annee de debut de la saison en cours (une saison "2024-25" est close à partir de juillet 2025)
+def current_season_start(today: Optional[datetime.date] = None) -> int:
+    today = today or datetime.date.today()
+    return today.year if today.month >= 7 else today.year - 1
+
+
+# une saison terminée ne bouge plus, on peut la garder en cache indéfiniment
+def is_completed_season(season: str, today: Optional[datetime.date] = None) -> bool:
+    return int(season[:4]) < current_season_start(today)
+
+
+def _is_response_entry(name: str) -> bool:
+    return name.endswith('.json')
+
+
+# cache disque des réponses de l'API, une entrée JSON par (endpoint, paramètres)
+class ResponseCache:
+
+    def __init__(self, cache_dir: str = "nba_cache", current_season_ttl_minutes: float = 30,
+                 max_size_mb: float = 50):
+
+        self.cache_dir = cache_dir
+        self.current_season_ttl = current_season_ttl_minutes * 60
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, endpoint: str, params: Dict) -> str:
+        raw = json.dumps({'endpoint': endpoint, 'params': params}, sort_keys=True)
+        key = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{endpoint}_{key}.json")
+
+    # retourne le DataFrame en cache, ou None si absent / expiré
+    def get(self, endpoint: str, params: Dict) -> Optional[pd.DataFrame]:
+
+        path = self._path(endpoint, params)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        if entry['expires_at'] is not None and entry['expires_at'] < time.time():
+            with self._lock:
+                self.misses += 1
+                self.expired += 1
+            return None
+
+        # on rafraichit la date d'accès pour l'éviction LRU
+        os.utime(path)
+        with self._lock:
+            self.hits += 1
+        return pd.DataFrame(entry['data'], columns=entry['columns'])
+
+    def put(self, endpoint: str, params: Dict, df: pd.DataFrame, season: Optional[str] = None):
+
+        expires_at = None
+        if season is None or not is_completed_season(season):
+            expires_at = time.time() + self.current_season_ttl
+
+        entry = {
+            'endpoint': endpoint,
+            'params': params,
+            'expires_at': expires_at,
+            'columns': list(df.columns),
+            'data': json.loads(df.to_json(orient='values')),
+        }
+
+        # écriture atomique : un lecteur concurrent ne voit jamais un fichier à moitié écrit
+        path = self._path(endpoint, params)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        self._evict()
+
+    # supprime les entrées les moins récemment utilisées tant que le cache dépasse la taille max
+    def _evict(self):
+        with self._lock:
+            self.evictions += evict_lru(self.cache_dir, self.max_size_bytes, _is_response_entry)
+
+    def clear(self):
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, name))
+
+    # stats du cache (hits / miss / taux)
+    def report(self) -> Dict:
+
+        total = self.hits + self.misses
+        entries = cache_entries(self.cache_dir, _is_response_entry)
+        stats = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+        }
+        print(f"Cache API : {stats['hits']} hit(s), {stats['misses']} miss(es) "
+              f"({stats['hit_rate']:.0%}), {stats['entries']} entrées, "
+              f"{stats['size_bytes'] / 1024:.0f} Ko")
+        return stats
+
+
+# genere la liste des saisons au format "2004-05" entre deux années de début
+def season_range(first_year: int, last_year: int) -> List[str]:
+    return [f"{year}-{str(year + 1)[-2:]}" for year in range(first_year, last_year + 1)]
+
+
+# transforme le DataFrame brut de LeagueLeaders en une seule passe vectorisée
+# (renommage, arrondis, pourcentages sur 100) au lieu d'un iterrows ligne par ligne
+def transform_leaders(df: pd.DataFrame, season: str) -> pd.DataFrame:
+
+    out = df.reindex(columns=list(LEADERS_COLUMNS)).rename(columns=LEADERS_COLUMNS)
+    out['position'] = out['position'].fillna('N/A')
+    out[LEADERS_STATS] = out[LEADERS_STATS].fillna(0).astype(float).round(1)
+    out[LEADERS_PCTS] = (out[LEADERS_PCTS].fillna(0).astype(float) * 100).round(1)
+    out['season'] = season
+    return out
+
+
+# boxscores bruts -> colonnes typées et compactes (une passe vectorisée)
+def transform_game_logs(df: pd.DataFrame, season: str) -> pd.DataFrame:
+
+    out = df.reindex(columns=list(GAME_LOG_COLUMNS)).rename(columns=GAME_LOG_COLUMNS)
+    out['player_id'] = out['player_id'].astype('int64')
+    # "0022400061" -> 22400061 : entier plutôt que texte, le préfixe "00" est constant
+    out['game_id'] = out['game_id'].astype('int64')
+    out['game_date'] = pd.to_datetime(out['game_date']).dt.strftime('%Y-%m-%d')
+    out['win'] = (out['win'] == 'W').astype('int8')
+    out['minutes'] = out['minutes'].astype(float).round(1)
+    out[GAME_LOG_COUNTS] = out[GAME_LOG_COUNTS].fillna(0).astype('int16')
+    out['season'] = season
+    return out
+
+
+# classement brut -> une ligne par équipe ; team_name = abréviation, comme dans players
+def transform_standings(df: pd.DataFrame, season: str) -> pd.DataFrame:
+
+    abbreviations = {team['id']: team['abbreviation'] for team in teams.get_teams()}
+    out = pd.DataFrame({
+        'team_id': df['TeamID'].astype('int64'),
+        'team_name': df['TeamID'].map(abbreviations),
+        'full_name': df['TeamCity'] + ' ' + df['TeamName'],
+        'wins': df['WINS'].astype('int64'),
+        'losses': df['LOSSES'].astype('int64'),
+        'win_pct': (df['WinPCT'].astype(float) * 100).round(1),
+    })
+    out['season'] = season
+    return out
+
 
 # pour recup les stats nba
 class NBAStatsScraper:
 
-    def __init__(self, season: str = "2024-25"):
+    def __init__(self, season: str = "2024-25", max_requests_per_host: int = 2,
+                 cache: Optional[ResponseCache] = None, use_cache: bool = True):
 
         self.season = season
+        # cache disque des réponses (désactivable avec use_cache=False)
+        self.cache = (cache or ResponseCache()) if use_cache else None
+        # limite le nombre de requêtes simultanées par hôte (stats.nba.com bloque vite)
+        self.max_requests_per_host = max_requests_per_host
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+        # saisons en échec lors du dernier backfill : {saison: message d'erreur}
+        self.failed_seasons = {}
+
+    # un semaphore par hote, partagé par tous les workers
+    def _host_slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_requests_per_host)
+            return self._host_slots[host]
+
+    # appelle un endpoint nba_api en passant par le cache, retourne le premier DataFrame
+    # `cache_season` sert à choisir la durée de vie de l'entrée (infinie si la saison est finie)
+    def _call_endpoint(self, endpoint_cls, cache_season: Optional[str], **params) -> pd.DataFrame:
+
+        endpoint = endpoint_cls.__name__
+        if self.cache:
+            df = self.cache.get(endpoint, params)
+            if df is not None:
+                return df
+
+        with self._host_slot(NBA_STATS_HOST):
+            response = endpoint_cls(**params)
+        df = response.get_data_frames()[0]
+
+        if self.cache:
+            self.cache.put(endpoint, params, df, season=cache_season)
+        return df
+
+    # appel brut à l'API pour une saison, lève une exception en cas d'échec
+    # avec as_frame=True les données restent en colonnes (DataFrame), sinon liste de dicts
+    def _fetch_season(self, season: str, as_frame: bool = False) -> Union[List[Dict], pd.DataFrame]:
+
+        # Appel à l'API NBA (ou au cache), converti en DataFrame
+        df = self._call_endpoint(
+            leagueleaders.LeagueLeaders, season,
+            season=season,
+            stat_category_abbreviation='PTS',
+            per_mode48='PerGame'
+        )
+
+        players = transform_leaders(df, season)
+        if as_frame:
+            return players
+        # mode compatibilité : une liste de dicts comme avant
+        return players.to_dict('records')
 
     # recup les plus fort de la ligue et retourne un sdico avc les stats des joeuurs
-    def fetch_league_leaders(self) -> List[Dict]:
+    # (ou un DataFrame en colonnes si as_frame=True)
+    def fetch_league_leaders(self, season: Optional[str] = None,
+                             as_frame: bool = False) -> Union[List[Dict], pd.DataFrame]:
+
+        season = season or self.season
+        print(f"Récupération des stats de la saison {season}...")
+
+        try:
+            players_data = self._fetch_season(season, as_frame)
+            print(f"✓ {len(players_data)} joueurs récupérés")
+            return players_data
+
+        except Exception as e:
+            print(f"✗ Erreur lors de la récupération: {e}")
+            return pd.DataFrame() if as_frame else []
+
+    # tous les matchs de tous les joueurs d'une saison, en un seul appel à l'API
+    def fetch_game_logs(self, season: Optional[str] = None) -> pd.DataFrame:
 
-        print(f"Récupération des stats de la saison {self.season}...")
+        season = season or self.season
+        print(f"Récupération des matchs de la saison {season}...")
 
         try:
-            # Appel à l'API NBA
-            leaders = leagueleaders.LeagueLeaders(
-                season=self.season,
-                stat_category_abbreviation='PTS',
-                per_mode48='PerGame'
+            df = self._call_endpoint(
+                playergamelogs.PlayerGameLogs, season,
+                season_nullable=season,
+                season_type_nullable='Regular Season'
             )
+            logs = transform_game_logs(df, season)
+            print(f"✓ {len(logs)} lignes de matchs récupérées")
+            return logs
 
-            # Conversion en DataFrame
-            df = leaders.get_data_frames()[0]
-
-            # Transformation des données
-            players_data = []
-            for _, row in df.iterrows():
-                player = {
-                    'player_id': row.get('PLAYER_ID'),
-                    'player_name': row.get('PLAYER'),
-                    'team_name': row.get('TEAM'),
-                    'position': row.get('POSITION', 'N/A'),
-                    'games_played': row.get('GP'),
-                    'ppg': round(row.get('PTS', 0), 1),
-                    'rpg': round(row.get('REB', 0), 1),
-                    'apg': round(row.get('AST', 0), 1),
-                    'spg': round(row.get('STL', 0), 1),
-                    'bpg': round(row.get('BLK', 0), 1),
-                    'fg_pct': round(row.get('FG_PCT', 0) * 100, 1),
-                    'three_pct': round(row.get('FG3_PCT', 0) * 100, 1),
-                    'ft_pct': round(row.get('FT_PCT', 0) * 100, 1),
-                    'season': self.season
-                }
-                players_data.append(player)
+        except Exception as e:
+            print(f"✗ Erreur lors de la récupération: {e}")
+            return pd.DataFrame()
 
-            print(f"✓ {len(players_data)} joueurs récupérés")
-            return players_data
+    # classement des 30 équipes (victoires / défaites) pour une saison
+    def fetch_standings(self, season: Optional[str] = None) -> pd.DataFrame:
+
+        season = season or self.season
+        print(f"Récupération du classement de la saison {season}...")
+
+        try:
+            df = self._call_endpoint(
+                leaguestandingsv3.LeagueStandingsV3, season,
+                season=season,
+                season_type='Regular Season'
+            )
+            standings = transform_standings(df, season)
+            print(f"✓ {len(standings)} équipes récupérées")
+            return standings
 
         except Exception as e:
             print(f"✗ Erreur lors de la récupération: {e}")
-            return []
+            return pd.DataFrame()
+
+    # recup plusieurs saisons en parallèle avec un pool de workers borné
+    # `completed` contient les saisons déjà récupérées (résultat d'un appel précédent) :
+    # elles ne sont pas re-téléchargées, ce qui permet de reprendre après un échec
+    def backfill_seasons(self, seasons: Iterable[str], max_workers: int = 4,
+                         completed: Optional[Dict[str, List[Dict]]] = None,
+                         on_progress: Optional[Callable[[str, str, int], None]] = None,
+                         as_frame: bool = False) -> Dict[str, Union[List[Dict], pd.DataFrame]]:
+
+        results = dict(completed or {})
+        pending = [s for s in dict.fromkeys(seasons) if s not in results]
+        self.failed_seasons = {}
+
+        if not pending:
+            print("✓ Toutes les saisons sont déjà récupérées")
+            return results
+
+        print(f"Récupération de {len(pending)} saison(s) "
+              f"({max_workers} workers, {self.max_requests_per_host} requêtes max par hôte)...")
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self._fetch_season, season, as_frame): season for season in pending}
+            for future in as_completed(futures):
+                season = futures[future]
+                try:
+                    results[season] = future.result()
+                    status = "ok"
+                    print(f"✓ {season} : {len(results[season])} joueurs récupérés")
+                except Exception as e:
+                    self.failed_seasons[season] = str(e)
+                    status = "error"
+                    print(f"✗ {season} : {e}")
+
+                if on_progress:
+                    on_progress(season, status, len(results.get(season, [])))
+
+        elapsed = time.perf_counter() - start
+        print(f"✓ {len(pending) - len(self.failed_seasons)}/{len(pending)} saisons "
+              f"récupérées en {elapsed:.1f}s")
+        if self.failed_seasons:
+            print(f"⚠ Saisons en échec (à relancer) : {', '.join(sorted(self.failed_seasons))}")
 
+        return results
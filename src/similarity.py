@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from typing import List, Optional, Tuple
+
+from database import NBADatabase
+
+# scipy est optionnel : sans lui on garde une recherche exhaustive vectorisée (NumPy)
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# statistiques utilisées pour comparer les joueurs
+SIMILARITY_FEATURES = [
+    'points_per_game', 'rebounds_per_game', 'assists_per_game',
+    'steals_per_game', 'blocks_per_game',
+    'field_goal_pct', 'three_point_pct', 'free_throw_pct',
+]
+
+
+# une écriture qui déplace une moyenne ou un écart-type de plus de cette fraction d'écart-type
+# renormalise toute la matrice ; en dessous, seules les lignes modifiées sont recalculées
+RENORMALIZE_TOLERANCE = 0.01
+# lignes modifiées ou ajoutées depuis la construction de l'arbre (cherchées hors de l'arbre)
+# au-delà desquelles l'arbre est reconstruit, en fraction du nombre de lignes
+STALE_TREE_FRACTION = 0.1
+
+
+# index des joueurs dans l'espace des stats normalisées (z-scores).
+# La distance euclidienne entre deux lignes mesure à quel point deux profils diffèrent ;
+# la similarité vaut 1 / (1 + distance).
+class PlayerSimilarity:
+
+    def __init__(self, db: NBADatabase, features: Optional[List[str]] = None):
+
+        self.db = db
+        self.features = features or SIMILARITY_FEATURES
+        self.build()
+        # mise à jour incrémentale après chaque insert_players
+        self.db.add_write_listener(self.update)
+
+    # construit la matrice complète à partir de la table players
+    def build(self):
+
+        frame = self.db.get_players_frame()
+        self.info = frame[['player_id', 'player_name', 'team_name', 'season']].reset_index(drop=True)
+        self.raw = frame[self.features].to_numpy(dtype=float, na_value=0.0)
+        self._row_of = {key: i for i, key in
+                        enumerate(zip(self.info['player_id'], self.info['season']))}
+        self._reindex()
+
+    # recalcule la normalisation et l'index spatial (O(N·d) + O(N log N), pas de requête SQL)
+    def _reindex(self):
+
+        # sommes par colonne tenues à jour par update : nouvelles moyennes en O(lignes modifiées)
+        self._sum = self.raw.sum(axis=0)
+        self._sum_sq = np.square(self.raw).sum(axis=0)
+        self.mean = self.raw.mean(axis=0) if len(self.raw) else np.zeros(len(self.features))
+        std = self.raw.std(axis=0) if len(self.raw) else np.ones(len(self.features))
+        self.std = np.where(std > 0, std, 1.0)
+        self.matrix = (self.raw - self.mean) / self.std
+        self._player_ids = self.info['player_id'].to_numpy()
+        self._build_tree()
+
+    # arbre k-d sur la matrice actuelle (recherche exhaustive sans scipy)
+    def _build_tree(self):
+        self.tree = cKDTree(self.matrix) if cKDTree is not None and len(self.matrix) else None
+        self._tree_size = len(self.matrix)
+        # lignes de l'arbre dont la position n'est plus à jour
+        self._stale = set()
+
+    # moyennes et écarts-types de toutes les lignes actuelles, à partir des sommes
+    def _current_normalization(self) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(self.raw)
+        mean = self._sum / n
+        std = np.sqrt(np.maximum(self._sum_sq / n - np.square(mean), 0.0))
+        return mean, np.where(std > 0, std, 1.0)
+
+    # appelé par NBADatabase après une écriture : seules les lignes modifiées sont relues.
+    # Si la normalisation bouge peu, elles sont recalculées sur place et cherchées hors de
+    # l'arbre jusqu'à sa prochaine reconstruction
+    def update(self, keys: List[Tuple[int, str]]):
+
+        changed = self.db.get_players_by_keys(keys)
+        if changed.empty:
+            return
+
+        values = changed[self.features].to_numpy(dtype=float, na_value=0.0)
+        updated, new_rows = [], []
+        for i, key in enumerate(zip(changed['player_id'], changed['season'])):
+            row = self._row_of.get(key)
+            if row is None:
+                new_rows.append(i)
+                continue
+            self._sum += values[i] - self.raw[row]
+            self._sum_sq += np.square(values[i]) - np.square(self.raw[row])
+            self.raw[row] = values[i]
+            self.info.loc[row, ['player_name', 'team_name']] = \
+                changed.iloc[i][['player_name', 'team_name']].values
+            updated.append(row)
+
+        if new_rows:
+            start = len(self.raw)
+            added = changed.iloc[new_rows][['player_id', 'player_name', 'team_name', 'season']]
+            self.info = pd.concat([self.info, added], ignore_index=True)
+            self.raw = np.vstack([self.raw, values[new_rows]])
+            self._sum += values[new_rows].sum(axis=0)
+            self._sum_sq += np.square(values[new_rows]).sum(axis=0)
+            self._player_ids = np.concatenate([self._player_ids, added['player_id'].to_numpy()])
+            for offset, key in enumerate(zip(added['player_id'], added['season'])):
+                self._row_of[key] = start + offset
+            updated.extend(range(start, len(self.raw)))
+
+        mean, std = self._current_normalization()
+        drift = np.maximum(np.abs(mean - self.mean), np.abs(std - self.std)) / self.std
+        if len(self.matrix) == 0 or drift.max() > RENORMALIZE_TOLERANCE:
+            self._reindex()
+            return
+
+        rows = np.array(updated)
+        if new_rows:
+            self.matrix = np.vstack([self.matrix, np.empty((len(new_rows), len(self.features)))])
+        self.matrix[rows] = (self.raw[rows] - self.mean) / self.std
+        self._stale.update(row for row in updated if row < self._tree_size)
+        outside = len(self._stale) + len(self.matrix) - self._tree_size
+        if outside > STALE_TREE_FRACTION * len(self.matrix):
+            self._build_tree()
+
+    # matrice N x N des similarités entre tous les joueurs (calcul NumPy vectorisé)
+    def similarity_matrix(self) -> np.ndarray:
+
+        squared = np.einsum('ij,ij->i', self.matrix, self.matrix)
+        distances = squared[:, None] + squared[None, :] - 2 * self.matrix @ self.matrix.T
+        np.maximum(distances, 0, out=distances)
+        return 1.0 / (1.0 + np.sqrt(distances))
+
+    # k plus proches voisins d'une ligne de la matrice, sans les autres saisons du même joueur
+    # (ni la ligne elle-même)
+    def _nearest(self, row: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+
+        query = self.matrix[row]
+        same_player = self._player_ids == self._player_ids[row]
+
+        if self.tree is None:
+            diff = self.matrix - query
+            all_distances = np.sqrt(np.einsum('ij,ij->i', diff, diff))
+            candidates = np.flatnonzero(~same_player)
+            distances = all_distances[candidates]
+        else:
+            # dans l'arbre : assez de voisins pour écarter le joueur et les lignes périmées
+            n = min(k + int(same_player[:self._tree_size].sum()) + len(self._stale),
+                    self._tree_size)
+            tree_distances, tree_rows = self.tree.query(query, k=n)
+            tree_distances, tree_rows = np.atleast_1d(tree_distances), np.atleast_1d(tree_rows)
+            stale = np.fromiter(self._stale, dtype=int, count=len(self._stale))
+            keep = ~same_player[tree_rows] & ~np.isin(tree_rows, stale)
+            # hors de l'arbre : lignes modifiées ou ajoutées depuis sa construction, distance exacte
+            outside = np.concatenate([stale, np.arange(self._tree_size, len(self.matrix))])
+            outside = outside[~same_player[outside]]
+            diff = self.matrix[outside] - query
+            candidates = np.concatenate([tree_rows[keep], outside])
+            distances = np.concatenate([tree_distances[keep],
+                                        np.sqrt(np.einsum('ij,ij->i', diff, diff))])
+
+        order = np.argsort(distances, kind='stable')[:k]
+        return candidates[order], distances[order]
+
+    # les k joueurs au profil le plus proche (toutes saisons confondues, autres que ce joueur)
+    def most_similar(self, player_id: int, season: Optional[str] = None, k: int = 5) -> pd.DataFrame:
+
+        if season is None:
+            # saison la plus récente chargée pour ce joueur
+            seasons = self.info.loc[self.info['player_id'] == player_id, 'season']
+            if seasons.empty:
+                return pd.DataFrame()
+            season = seasons.max()
+
+        row = self._row_of.get((player_id, season))
+        if row is None:
+            return pd.DataFrame()
+
+        rows, distances = self._nearest(row, k)
+        result = self.info.iloc[rows].reset_index(drop=True)
+        result['distance'] = np.round(distances, 3)
+        result['similarity'] = np.round(1.0 / (1.0 + distances), 3)
+        return result
+
+    # même chose à partir d'un nom (recherche plein texte de la base)
+    def most_similar_to(self, name: str, k: int = 5) -> pd.DataFrame:
+
+        match = self.db.search_players(name, limit=1)
+        if match.empty:
+            return pd.DataFrame()
+        return self.most_similar(int(match.iloc[0]['player_id']), match.iloc[0]['season'], k)
+
+    def close(self):
+        self.db.remove_write_listener(self.update)
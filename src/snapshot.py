@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+
+# Instantané colonne par colonne de la table players, partitionné par saison :
+#
+#   snapshots/
+#       CURRENT                  nom de la version publiée
+#       v-<horodatage>-<pid>/
+#           manifest.json
+#           season=2023-24/player_name.npy, points_per_game.npy, ...
+#           season=2024-25/...
+#
+# Chaque colonne est un fichier .npy à largeur fixe (pas de pickle) ; une colonne de texte
+# a en plus <colonne>.null.npy, le masque de ses valeurs NULL (stockées '' dans le tableau
+# de textes, None après load_snapshot). open_snapshot les ouvre
+# avec mmap_mode='r' (sans copie : seules les pages lues sont chargées, et partagées entre
+# processus) ; load_snapshot construit un DataFrame, donc une copie en mémoire.
+#
+# Une version est écrite dans son propre dossier temporaire, renommée, puis publiée en
+# remplaçant CURRENT (os.replace, atomique) : un lecteur voit l'ancienne ou la nouvelle
+# version, jamais un dossier absent ou à moitié écrit, et deux écrivains ne se gênent pas.
+
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+NULL_SUFFIX = ".null"
+VERSION_PREFIX = "v-"
+TMP_PREFIX = ".tmp-"
+# une version remplacée reste lisible ce temps-là, puis est supprimée à une écriture suivante
+SUPERSEDED_GRACE_SECONDS = 60
+# dossiers temporaires laissés par un écrivain interrompu, supprimés après ce délai
+STALE_TMP_SECONDS = 3600
+
+
+def _partition_dir(directory: str, season: str) -> str:
+    return os.path.join(directory, f"season={season}")
+
+
+# colonne pandas -> tableaux NumPy sans objets Python : {nom de fichier: tableau}.
+# Les textes deviennent des '<U..' accompagnés du masque de leurs valeurs NULL
+def _to_column_arrays(col: str, series: pd.Series) -> Dict[str, np.ndarray]:
+    if series.dtype == object:
+        nulls = series.isna().to_numpy()
+        return {col: series.fillna('').astype(str).to_numpy(dtype=str),
+                f"{col}{NULL_SUFFIX}": nulls}
+    return {col: series.to_numpy()}
+
+
+def write_snapshot(frame: pd.DataFrame, directory: str = "snapshots",
+                   data_version: Optional[int] = None, source: Optional[str] = None) -> Dict:
+
+    os.makedirs(directory, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=TMP_PREFIX, dir=directory)
+
+    manifest = {
+        'data_version': data_version,
+        'source': source,
+        'columns': {col: str(dtype) for col, dtype in frame.dtypes.items()},
+        'seasons': {},
+    }
+
+    try:
+        for season, part in frame.groupby('season', sort=True):
+            partition = _partition_dir(tmp_dir, season)
+            os.makedirs(partition)
+            for col in frame.columns:
+                for name, values in _to_column_arrays(col, part[col]).items():
+                    np.save(os.path.join(partition, f"{name}.npy"), values, allow_pickle=False)
+            manifest['seasons'][season] = len(part)
+
+        with open(os.path.join(tmp_dir, MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+
+        # nom choisi à la publication : une version plus récente a un nom plus grand
+        version = f"{VERSION_PREFIX}{time.time_ns()}-{os.getpid()}"
+        os.rename(tmp_dir, os.path.join(directory, version))
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    fd, tmp_pointer = tempfile.mkstemp(prefix=TMP_PREFIX, dir=directory)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(tmp_pointer, os.path.join(directory, CURRENT))
+
+    _remove_old_versions(directory, version)
+    print(f"✓ Instantané écrit dans {directory} "
+          f"({len(frame)} lignes, {len(manifest['seasons'])} saison(s))")
+    return manifest
+
+
+# supprime les versions remplacées depuis plus de SUPERSEDED_GRACE_SECONDS (un lecteur qui a
+# résolu CURRENT juste avant la publication peut encore les lire) et l'ancien format sans
+# CURRENT. Les versions publiées après la nôtre et les dossiers temporaires récents sont gardés
+def _remove_old_versions(directory: str, current: str):
+
+    now = time.time()
+    entries = os.listdir(directory)
+    versions = sorted(e for e in entries if e.startswith(VERSION_PREFIX) and e <= current)
+    # une version est remplacée à la publication de la suivante (horodatage de son nom)
+    superseded = {version: _published_at(successor)
+                  for version, successor in zip(versions, versions[1:])}
+
+    for entry in entries:
+        path = os.path.join(directory, entry)
+        if entry in (CURRENT, current) or entry.startswith(VERSION_PREFIX) and entry > current:
+            continue
+        try:
+            if entry.startswith(VERSION_PREFIX):
+                if now - superseded[entry] < SUPERSEDED_GRACE_SECONDS:
+                    continue
+            elif entry.startswith(TMP_PREFIX):
+                if now - os.path.getmtime(path) < STALE_TMP_SECONDS:
+                    continue
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                os.remove(path)
+        except OSError:
+            # déjà supprimé par un autre écrivain
+            pass
+
+
+def _published_at(version: str) -> float:
+    return int(version[len(VERSION_PREFIX):].split('-')[0]) / 1e9
+
+
+# dossier de la version publiée dans directory. Un dossier de version (ou un instantané à
+# l'ancien format, sans CURRENT) est renvoyé tel quel ; None s'il n'y a pas d'instantané
+def current_snapshot(directory: str = "snapshots") -> Optional[str]:
+
+    try:
+        with open(os.path.join(directory, CURRENT), encoding='utf-8') as f:
+            version = f.read().strip()
+    except OSError:
+        return directory if os.path.exists(os.path.join(directory, MANIFEST)) else None
+    return os.path.join(directory, version) if version else None
+
+
+def read_manifest(directory: str = "snapshots") -> Optional[Dict]:
+    version = current_snapshot(directory)
+    if version is None:
+        return None
+    try:
+        with open(os.path.join(version, MANIFEST), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# accès direct aux colonnes mappées en mémoire : {saison: {colonne: tableau}}, sans copie.
+# Les colonnes de texte ont aussi leur masque de NULL, sous la clé '<colonne>.null'
+def open_snapshot(directory: str = "snapshots", seasons: Optional[List[str]] = None,
+                  columns: Optional[List[str]] = None) -> Dict[str, Dict[str, np.ndarray]]:
+
+    # la version est résolue une fois : manifeste et colonnes viennent du même dossier
+    version = current_snapshot(directory)
+    manifest = read_manifest(version) if version else None
+    if manifest is None:
+        raise FileNotFoundError(f"Aucun instantané dans {directory}")
+
+    columns = columns or list(manifest['columns'])
+    names = columns + [f"{col}{NULL_SUFFIX}" for col in columns
+                       if manifest['columns'][col] == 'object']
+    partitions = {}
+    for season in seasons or list(manifest['seasons']):
+        if season not in manifest['seasons']:
+            continue
+        partition = _partition_dir(version, season)
+        partitions[season] = {
+            name: np.load(os.path.join(partition, f"{name}.npy"), mmap_mode='r')
+            for name in names
+        }
+    return partitions
+
+
+# DataFrame des saisons/colonnes demandées, avec les mêmes types et les mêmes NULL que la
+# table d'origine, lignes dans l'ordre des saisons puis dans l'ordre d'écriture.
+# Les colonnes sont copiées en mémoire (concaténation des saisons, textes en objets Python)
+def load_snapshot(directory: str = "snapshots", seasons: Optional[List[str]] = None,
+                  columns: Optional[List[str]] = None) -> pd.DataFrame:
+
+    version = current_snapshot(directory)
+    if version is None:
+        raise FileNotFoundError(f"Aucun instantané dans {directory}")
+    manifest = read_manifest(version)
+    if manifest is None:
+        raise FileNotFoundError(f"Aucun instantané dans {directory}")
+    partitions = open_snapshot(version, seasons, columns)
+    columns = columns or list(manifest['columns'])
+
+    data = {}
+    for col in columns:
+        parts = [partitions[season][col] for season in partitions]
+        values = np.concatenate(parts) if parts else np.array([])
+        if manifest['columns'][col] == 'object':
+            values = values.astype(object)
+            nulls = [partitions[season][f"{col}{NULL_SUFFIX}"] for season in partitions]
+            if nulls:
+                values[np.concatenate(nulls)] = None
+        data[col] = values
+    return pd.DataFrame(data, columns=columns)
@@ -0,0 +1,216 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Temps de démarrage à froid, chaque mesure dans un nouveau processus Python :
+#   - import de main.py et de gui.py (et modules lourds chargés au passage)
+#   - lancement de `python main.py` jusqu'à l'affichage du menu
+#   - création de la fenêtre Tk jusqu'au premier affichage (ignoré sans écran)
+#
+#   python startup_benchmark.py
+#   python startup_benchmark.py --compare bench_results/startup_precedent.json
+#
+# Code retour 1 si un module lourd est chargé au démarrage ou, avec --compare, si une mesure
+# est plus lente que la référence au-delà de --threshold.
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = "bench_results"
+# modules qui ne doivent être importés qu'au premier usage (graphique, API NBA, similarité)
+HEAVY_MODULES = ['matplotlib', 'nba_api', 'scipy']
+
+IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed,
+                  'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+WINDOW_SCRIPT = """
+import tkinter as tk
+from gui import NBAStatsGUI
+try:
+    app = NBAStatsGUI()
+except tk.TclError as e:
+    print('NO_DISPLAY', e, flush=True)
+    raise SystemExit(0)
+app.root.update()
+print('READY', flush=True)
+app.root.destroy()
+app.tasks.shutdown()
+app.db.close()
+"""
+
+
+def _env() -> Dict[str, str]:
+    # sortie non bufferisée : le menu est lu dès qu'il est affiché
+    return dict(os.environ, PYTHONPATH=SRC_DIR, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+
+
+def _summary(runs: List[float]) -> Dict:
+    return {'min_s': round(min(runs), 6), 'median_s': round(statistics.median(runs), 6),
+            'runs': len(runs)}
+
+
+def time_interpreter(repeat: int) -> Dict:
+
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        runs.append(time.perf_counter() - start)
+    return _summary(runs)
+
+
+# durée de `import module` mesurée dans le processus fils, et modules lourds chargés
+def time_import(module: str, repeat: int) -> Dict:
+
+    runs, heavy = [], set()
+    script = IMPORT_SCRIPT.format(module=module, heavy=HEAVY_MODULES)
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', script], cwd=SRC_DIR, env=_env(),
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        runs.append(result['elapsed'])
+        heavy.update(result['heavy'])
+    return dict(_summary(runs), heavy_modules=sorted(heavy))
+
+
+# lance une commande et mesure le temps jusqu'à la première ligne contenant un des marqueurs
+def _time_until(command: List[str], markers: List[str], workdir: str,
+                stdin_text: str = '') -> Optional[float]:
+
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=workdir, env=_env(), stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                               encoding='utf-8')
+    elapsed, found = None, None
+    for line in process.stdout:
+        found = next((marker for marker in markers if marker in line), None)
+        if found:
+            elapsed = time.perf_counter() - start
+            break
+    _, errors = process.communicate(stdin_text)
+    if found is None:
+        raise RuntimeError(f"{' '.join(command)} : marqueur {markers} introuvable\n{errors}")
+    return elapsed if found == markers[0] else None
+
+
+def time_first_menu(repeat: int, workdir: str) -> Dict:
+
+    runs = [_time_until([sys.executable, os.path.join(SRC_DIR, 'main.py')],
+                        ['Menu Principal'], workdir, stdin_text='0\n')
+            for _ in range(repeat)]
+    return _summary(runs)
+
+
+# None sans écran (Tk ne peut pas ouvrir de fenêtre) : la mesure est ignorée
+def time_first_window(repeat: int, workdir: str) -> Optional[Dict]:
+
+    runs = []
+    for _ in range(repeat):
+        elapsed = _time_until([sys.executable, '-c', WINDOW_SCRIPT],
+                              ['READY', 'NO_DISPLAY'], workdir)
+        if elapsed is None:
+            return None
+        runs.append(elapsed)
+    return _summary(runs)
+
+
+# mesures plus lentes que la référence (médianes comparées)
+def find_regressions(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+
+    regressions = []
+    for name, timing in current['operations'].items():
+        before = baseline.get('operations', {}).get(name)
+        if not before or before['median_s'] <= 0:
+            continue
+        ratio = timing['median_s'] / before['median_s']
+        if ratio > threshold:
+            regressions.append(f"{name} : {before['median_s'] * 1000:.0f} ms -> "
+                               f"{timing['median_s'] * 1000:.0f} ms (x{ratio:.2f})")
+    return regressions
+
+
+def run(repeat: int, output: Optional[str], baseline: Optional[str] = None,
+        threshold: float = 1.25) -> int:
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'operations': {},
+    }
+    operations = report['operations']
+
+    # un premier import compile les .pyc : il n'est pas compté
+    subprocess.run([sys.executable, '-c', 'import main, gui'], cwd=SRC_DIR, env=_env(),
+                   capture_output=True)
+
+    operations['python'] = time_interpreter(repeat)
+    operations['import_main'] = time_import('main', repeat)
+    operations['import_gui'] = time_import('gui', repeat)
+    with tempfile.TemporaryDirectory(prefix="nba_startup_") as workdir:
+        # base vide dans un dossier temporaire : la vraie base n'est pas touchée
+        operations['first_menu'] = time_first_menu(repeat, workdir)
+        window = time_first_window(repeat, workdir)
+    if window is not None:
+        operations['first_window'] = window
+    else:
+        print("⚠  Pas d'écran disponible : first_window ignoré")
+
+    for name, timing in operations.items():
+        print(f"   {name:<16} {timing['median_s'] * 1000:>8.0f} ms")
+
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"startup_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"✓ Résultats enregistrés dans {output}")
+
+    status = 0
+    for name in ('import_main', 'import_gui'):
+        heavy = operations[name]['heavy_modules']
+        if heavy:
+            print(f"✗ {name} charge des modules lourds au démarrage : {', '.join(heavy)}")
+            status = 1
+
+    if baseline:
+        with open(baseline, encoding='utf-8') as f:
+            regressions = find_regressions(report, json.load(f), threshold)
+        if regressions:
+            print(f"✗ {len(regressions)} régression(s) (seuil x{threshold}) :")
+            for line in regressions:
+                print(f"   {line}")
+            status = 1
+        else:
+            print(f"✓ Aucune régression par rapport à {baseline}")
+    return status
+
+
+def main(argv: Optional[List[str]] = None):
+
+    parser = argparse.ArgumentParser(description="Temps de démarrage de NBA Stats Manager")
+    parser.add_argument('--repeat', type=int, default=5, help="lancements par mesure")
+    parser.add_argument('--output', help=f"fichier JSON (défaut: {RESULTS_DIR}/startup_<date>.json)")
+    parser.add_argument('--compare', help="résultats de référence (JSON) à comparer")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="ratio de médiane au-delà duquel une mesure est en régression")
+    args = parser.parse_args(argv)
+
+    sys.exit(run(args.repeat, args.output, args.compare, args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+from database import PLAYER_KEYS
+from scraper import season_range
+
+# Données de ligue synthétiques pour les benchmarks (aucun appel à l'API NBA).
+# Les joueurs gardent le même player_id d'une saison à l'autre, changent parfois d'équipe,
+# et les distributions (points, rebonds, pourcentages...) ressemblent à celles d'une vraie saison.
+
+TEAMS = [
+    'ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW',
+    'HOU', 'IND', 'LAC', 'LAL', 'MEM', 'MIA', 'MIL', 'MIN', 'NOP', 'NYK',
+    'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS',
+]
+
+POSITIONS = ['G', 'F', 'C', 'G-F', 'F-C']
+
+FIRST_NAMES = [
+    'James', 'Kevin', 'Luka', 'Nikola', 'Jayson', 'Anthony', 'Devin', 'Tyrese', 'Jalen',
+    'Donovan', 'Stephen', 'Joel', 'Victor', 'Paolo', 'Scottie', 'Trae', 'Zion', 'Bam',
+    'Jaren', 'De\'Aaron', 'Domantas', 'Shai', 'Giannis', 'Damian', 'Karl', 'Mikal',
+]
+
+LAST_NAMES = [
+    'Johnson', 'Williams', 'Brown', 'Jones', 'Miller', 'Davis', 'Harris', 'Martin',
+    'Thompson', 'Walker', 'Young', 'Allen', 'Green', 'Adams', 'Baker', 'Nelson', 'Carter',
+    'Mitchell', 'Roberts', 'Turner', 'Phillips', 'Campbell', 'Parker', 'Evans', 'Edwards',
+    'Collins', 'Jokić', 'Dončić', 'Antetokounmpo', 'Wembanyama', 'Sabonis', 'Porziņģis',
+]
+
+FIRST_PLAYER_ID = 1_000_000
+FIRST_GAME_ID = 29_000_000
+
+
+# n_seasons saisons x n_players joueurs, au format attendu par NBADatabase.insert_players
+def generate_players(n_seasons: int = 1, n_players: int = 500, last_season: int = 2024,
+                     seed: int = 0) -> pd.DataFrame:
+
+    rng = np.random.default_rng(seed)
+    seasons = season_range(last_season - n_seasons + 1, last_season)
+
+    # identité : fixée une fois pour toute la carrière
+    player_ids = np.arange(FIRST_PLAYER_ID, FIRST_PLAYER_ID + n_players)
+    names = (np.array(FIRST_NAMES, dtype=object)[rng.integers(len(FIRST_NAMES), size=n_players)]
+             + ' '
+             + np.array(LAST_NAMES, dtype=object)[rng.integers(len(LAST_NAMES), size=n_players)])
+    positions = np.array(POSITIONS, dtype=object)[rng.integers(len(POSITIONS), size=n_players)]
+    # niveau du joueur (quelques stars, beaucoup de remplaçants), rôle selon le poste
+    talent = rng.gamma(2.0, 4.5, size=n_players)
+    big = np.isin(positions, ['C', 'F-C'])
+
+    frames = []
+    team_index = rng.integers(len(TEAMS), size=n_players)
+    for season in seasons:
+        # environ 10 % de transferts par saison
+        traded = rng.random(n_players) < 0.1
+        team_index = np.where(traded, rng.integers(len(TEAMS), size=n_players), team_index)
+        form = talent * rng.normal(1.0, 0.12, size=n_players)
+
+        ppg = np.clip(form, 0, 40)
+        rpg = np.clip(ppg * np.where(big, 0.45, 0.2) + rng.normal(1.5, 1.0, n_players), 0, 16)
+        apg = np.clip(ppg * np.where(big, 0.12, 0.28) + rng.normal(0.5, 0.8, n_players), 0, 12)
+
+        frames.append(pd.DataFrame({
+            'player_id': player_ids,
+            'player_name': names,
+            'team_name': np.array(TEAMS, dtype=object)[team_index],
+            'position': positions,
+            'games_played': rng.integers(1, 83, size=n_players),
+            'ppg': ppg.round(1),
+            'rpg': rpg.round(1),
+            'apg': apg.round(1),
+            'spg': np.clip(rng.normal(0.8, 0.4, n_players), 0, 3).round(1),
+            'bpg': np.clip(rng.normal(np.where(big, 1.2, 0.4), 0.4), 0, 4).round(1),
+            'fg_pct': np.clip(rng.normal(np.where(big, 54, 45), 5), 25, 75).round(1),
+            'three_pct': np.clip(rng.normal(35, 6, n_players), 0, 55).round(1),
+            'ft_pct': np.clip(rng.normal(77, 8, n_players), 40, 95).round(1),
+            'season': season,
+        }))
+
+    return pd.concat(frames, ignore_index=True)[PLAYER_KEYS]
+
+
+# un match par joueur et par match joué, au format attendu par NBADatabase.insert_game_logs.
+# Les points de chaque match suivent une loi de Poisson centrée sur la moyenne du joueur
+def generate_game_logs(players: pd.DataFrame, season: Optional[str] = None,
+                       seed: int = 0) -> pd.DataFrame:
+
+    rng = np.random.default_rng(seed)
+    if season is not None:
+        players = players[players['season'] == season]
+
+    games = players['games_played'].to_numpy()
+    rows = np.repeat(np.arange(len(players)), games)
+    n = len(rows)
+    # numéro du match dans la saison du joueur (0, 1, 2... pour chaque joueur)
+    game_number = np.arange(n) - np.repeat(np.cumsum(games) - games, games)
+    start_year = players['season'].str[:4].astype(int).to_numpy()[rows]
+    dates = (pd.to_datetime(pd.Series(start_year).astype(str) + '-10-22')
+             + pd.to_timedelta(game_number * 2, unit='D'))
+
+    def per_game(column):
+        return players[column].to_numpy(dtype=float)[rows]
+
+    pts = rng.poisson(per_game('ppg'))
+    fga = np.maximum(pts // 2 + rng.integers(0, 5, n), 1)
+    fg3a = rng.integers(0, 9, n)
+    fta = rng.integers(0, 8, n)
+    team = players['team_name'].to_numpy()[rows]
+    opponent = np.array(TEAMS, dtype=object)[rng.integers(len(TEAMS), size=n)]
+    home = rng.random(n) < 0.5
+
+    logs = pd.DataFrame({
+        'player_id': players['player_id'].to_numpy()[rows],
+        'game_id': FIRST_GAME_ID + np.arange(n),
+        'season': players['season'].to_numpy()[rows],
+        'game_date': dates.dt.strftime('%Y-%m-%d').to_numpy(),
+        'team_name': team,
+        'matchup': np.where(home, team + ' vs. ' + opponent, team + ' @ ' + opponent),
+        'win': (rng.random(n) < 0.5).astype('int8'),
+        'minutes': np.clip(rng.normal(12 + per_game('ppg'), 5), 1, 48).round(1),
+        'pts': pts,
+        'reb': rng.poisson(per_game('rpg')),
+        'ast': rng.poisson(per_game('apg')),
+        'stl': rng.poisson(per_game('spg')),
+        'blk': rng.poisson(per_game('bpg')),
+        'tov': rng.poisson(1.5, n),
+        'fgm': np.minimum(rng.binomial(fga, per_game('fg_pct') / 100), fga),
+        'fga': fga,
+        'fg3m': rng.binomial(fg3a, per_game('three_pct') / 100),
+        'fg3a': fg3a,
+        'ftm': rng.binomial(fta, per_game('ft_pct') / 100),
+        'fta': fta,
+        'plus_minus': rng.integers(-25, 26, n),
+    })
+    return logs
@@ -0,0 +1,119 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Any
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+# une tâche lancée en arrière-plan : la fonction reçoit la tâche pour signaler
+# sa progression (report) et vérifier si l'utilisateur a demandé l'annulation
+class BackgroundTask:
+
+    def __init__(self, runner: 'TaskRunner', name: str):
+
+        self.name = name
+        self._runner = runner
+        self._cancel_event = threading.Event()
+        self._committed = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    @property
+    def committed(self) -> bool:
+        return self._committed
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    # à appeler juste après une écriture validée en base : l'annulation ne peut plus défaire
+    # le travail, la tâche n'est plus arrêtée et son résultat est rapporté (on_done)
+    def mark_committed(self):
+        self._committed = True
+
+    # à appeler entre deux étapes longues : arrête la tâche si elle a été annulée
+    # (sauf après mark_committed ; les étapes facultatives regardent alors `cancelled`)
+    def check_cancelled(self):
+        if self.cancelled and not self._committed:
+            raise TaskCancelled(self.name)
+
+    # message de progression, affiché par le thread Tk au prochain passage de la boucle
+    def report(self, message: str):
+        self._runner._events.put((self, 'progress', message))
+
+
+# exécute des fonctions dans des threads de travail sans jamais toucher Tk depuis ces threads :
+# les résultats passent par une file thread-safe, vidée par root.after() dans le thread Tk
+class TaskRunner:
+
+    def __init__(self, root, max_workers: int = 2, poll_ms: int = 50):
+
+        self.root = root
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._events = queue.Queue()
+        self._callbacks = {}
+        self.running = set()
+        self.root.after(self.poll_ms, self._poll)
+
+    # lance func(task) en arrière-plan ; les callbacks sont appelés dans le thread Tk
+    def submit(self, name: str, func: Callable[[BackgroundTask], Any],
+               on_done: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None,
+               on_progress: Optional[Callable[[str], None]] = None) -> BackgroundTask:
+
+        task = BackgroundTask(self, name)
+        self._callbacks[task] = (on_done, on_error, on_progress)
+        self.running.add(task)
+        self._executor.submit(self._run, task, func)
+        return task
+
+    def _run(self, task: BackgroundTask, func):
+        try:
+            result = func(task)
+            task.check_cancelled()
+            self._events.put((task, 'done', result))
+        except TaskCancelled:
+            self._events.put((task, 'cancelled', None))
+        except Exception as e:
+            self._events.put((task, 'error', e))
+
+    def _poll(self):
+
+        while True:
+            try:
+                task, kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            on_done, on_error, on_progress = self._callbacks.get(task, (None, None, None))
+            if kind == 'progress':
+                if on_progress and (not task.cancelled or task.committed):
+                    on_progress(payload)
+                continue
+
+            self.running.discard(task)
+            self._callbacks.pop(task, None)
+            if kind == 'done' and on_done:
+                on_done(payload)
+            elif kind == 'error' and on_error:
+                on_error(payload)
+
+        self.root.after(self.poll_ms, self._poll)
+
+    def is_running(self, name: str) -> bool:
+        return any(task.name == name for task in self.running)
+
+    def cancel_all(self):
+        for task in list(self.running):
+            task.cancel()
+
+    # annule tout et attend la fin des tâches déjà lancées (elles s'arrêtent au prochain
+    # check_cancelled) : la base peut ensuite être fermée sans couper une écriture en cours
+    def shutdown(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
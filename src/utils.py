@@ -1,5 +1,7 @@
 import pandas as pd
 
+from database import NBADatabase
+
 
 def display_stats_summary(df: pd.DataFrame):
 
@@ -10,20 +12,38 @@ def display_stats_summary(df: pd.DataFrame):
     print("=" * 60 + "\n")
 
 
+# une ligne de NBADatabase.get_team_summaries -> texte court
+def format_team_summary(summary: pd.Series) -> str:
+
+    text = f"{summary['team_name']} ({summary['season']})"
+    if pd.notna(summary.get('wins')):
+        text += f" | Bilan {int(summary['wins'])}-{int(summary['losses'])} ({summary['win_pct']:.1f}%)"
+    text += (f" | {int(summary['players'])} joueurs, {summary['total_points']:.1f} pts cumulés"
+             f" | Meilleur scoreur : {summary['top_scorer']} ({summary['top_scorer_ppg']:.1f})"
+             f" | Rebonds : {summary['top_rebounder']} ({summary['top_rebounder_rpg']:.1f})"
+             f" | Passes : {summary['top_passer']} ({summary['top_passer_apg']:.1f})")
+    return text
+
+
+# retourne une copie triée : le DataFrame reçu (souvent le cache partagé) n'est pas modifié.
+# La colonne efficiency vient normalement de la base (colonne générée), sinon on la calcule.
+# Pour un simple top N, préférer NBADatabase.get_ranked('efficiency', ...)
 def calculate_efficiency(df: pd.DataFrame) -> pd.DataFrame:
 
-    df['efficiency'] = (
-            df['points_per_game'] +
-            df['rebounds_per_game'] +
-            df['assists_per_game']
-    )
+    if 'efficiency' not in df.columns:
+        df = df.assign(efficiency=(
+                df['points_per_game'] +
+                df['rebounds_per_game'] +
+                df['assists_per_game']
+        ))
     return df.sort_values('efficiency', ascending=False)
 
 
-def compare_players(df: pd.DataFrame, player1: str, player2: str):
+def compare_players(db: NBADatabase, player1: str, player2: str):
 
-    p1_data = df[df['player_name'].str.contains(player1, case=False)]
-    p2_data = df[df['player_name'].str.contains(player2, case=False)]
+    # recherche dans l'index plein texte (insensible aux accents et à la casse)
+    p1_data = db.search_players(player1)
+    p2_data = db.search_players(player2)
 
     if not p1_data.empty and not p2_data.empty:
         print(f"\n🆚 Comparaison: {player1} vs {player2}")
@@ -32,4 +52,3 @@ def compare_players(df: pd.DataFrame, player1: str, player2: str):
         print(comparison.to_string(index=False))
     else:
         print("✗ Joueur(s) non trouvé(s)")
-
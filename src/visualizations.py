@@ -1,15 +1,62 @@
-import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
+from typing import List, NamedTuple, Optional, Tuple, TYPE_CHECKING
 
+# matplotlib n'est importé qu'à la première figure : le menu, le mode batch sans graphique
+# et la fenêtre de la GUI démarrent sans lui
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
 
-def plot_top_scorers(df: pd.DataFrame, limit: int = 10):
+
+# Les build_* construisent la figure sans toucher à l'état global de pyplot :
+# ils peuvent donc tourner dans un thread de travail (GUI) ou sans affichage.
+# Les plot_* gardent le comportement d'origine (sauvegarde + fenêtre pyplot) ; quality choisit
+# entre un aperçu rapide et le fichier final (voir QUALITY_TIERS). Sans filename, un aperçu
+# est enregistré sous <graphique>_preview.png, à côté du fichier final.
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _new_figure(figsize, use_pyplot: bool) -> 'Figure':
+    if use_pyplot:
+        return _pyplot().figure(figsize=figsize)
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+
+# niveaux de qualité des fichiers : "preview" pour un coup d'œil (basse résolution, sans le
+# second passage de bbox_inches='tight'), "final" pour l'impression. Le format (png, svg, pdf)
+# vient de l'extension du fichier ; svg et pdf sont vectoriels, le dpi n'y touche que les images
+QUALITY_TIERS = {
+    'preview': {'dpi': 72, 'bbox_inches': None},
+    'final': {'dpi': 300, 'bbox_inches': 'tight'},
+}
+FILE_FORMATS = ['png', 'svg', 'pdf']
+
+
+# nom par défaut des plot_* : un aperçu ne remplace pas le fichier final du même graphique
+def _default_filename(name: str, quality: str) -> str:
+    return f"{name}.png" if quality == 'final' else f"{name}_{quality}.png"
+
+
+def save_figure(fig: 'Figure', filename: str, quality: str = 'final'):
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"Qualité inconnue: {quality} (possibles: {', '.join(QUALITY_TIERS)})")
+    fig.savefig(filename, **QUALITY_TIERS[quality])
+    print(f"✓ Graphique sauvegardé: {filename}")
+
+
+def build_top_scorers(df: pd.DataFrame, limit: int = 10, use_pyplot: bool = False) -> 'Figure':
 
     # Préparer les données
     data = df.head(limit).sort_values('points_per_game', ascending=True)
 
     # Créer le graphique
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = _new_figure((10, 6), use_pyplot)
+    ax = fig.add_subplot()
 
     bars = ax.barh(data['player_name'], data['points_per_game'],
                    color='#1f77b4', edgecolor='black', linewidth=0.5)
@@ -30,21 +77,25 @@ def plot_top_scorers(df: pd.DataFrame, limit: int = 10):
     ax.grid(axis='x', alpha=0.3, linestyle='--', linewidth=0.5)
     ax.set_axisbelow(True)
 
-    plt.tight_layout()
-    plt.savefig('top_scorers.png', dpi=300, bbox_inches='tight')
-    print("✓ Graphique sauvegardé: top_scorers.png")
-    plt.show()
+    fig.tight_layout()
+    return fig
+
+
+def plot_top_scorers(df: pd.DataFrame, limit: int = 10, quality: str = 'final',
+                     filename: Optional[str] = None):
 
+    fig = build_top_scorers(df, limit, use_pyplot=True)
+    save_figure(fig, filename or _default_filename('top_scorers', quality), quality)
+    _pyplot().show()
 
-def plot_player_comparison(df: pd.DataFrame, player1: str, player2: str):
 
-    # Récupérer les données
-    p1 = df[df['player_name'].str.contains(player1, case=False)]
-    p2 = df[df['player_name'].str.contains(player2, case=False)]
+# p1 / p2 : résultats de NBADatabase.search_players, le meilleur résultat est utilisé
+def build_player_comparison(p1: pd.DataFrame, p2: pd.DataFrame,
+                            use_pyplot: bool = False) -> Optional['Figure']:
 
     if p1.empty or p2.empty:
         print("✗ Un ou plusieurs joueurs non trouvés")
-        return
+        return None
 
     p1 = p1.iloc[0]
     p2 = p2.iloc[0]
@@ -62,7 +113,8 @@ def plot_player_comparison(df: pd.DataFrame, player1: str, player2: str):
     x = np.arange(len(categories))
     width = 0.35
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig = _new_figure((10, 6), use_pyplot)
+    ax = fig.add_subplot()
 
     bars1 = ax.bar(x - width / 2, p1_values, width, label=p1['player_name'],
                    color='#1f77b4', edgecolor='black', linewidth=0.5)
@@ -79,24 +131,33 @@ def plot_player_comparison(df: pd.DataFrame, player1: str, player2: str):
     ax.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
     ax.set_axisbelow(True)
 
-    plt.tight_layout()
-    plt.savefig('player_comparison.png', dpi=300, bbox_inches='tight')
-    print("✓ Graphique sauvegardé: player_comparison.png")
-    plt.show()
+    fig.tight_layout()
+    return fig
+
 
+def plot_player_comparison(p1: pd.DataFrame, p2: pd.DataFrame, quality: str = 'final',
+                           filename: Optional[str] = None):
 
-def plot_team_analysis(df: pd.DataFrame, team_name: str):
+    fig = build_player_comparison(p1, p2, use_pyplot=True)
+    if fig is None:
+        return
+    save_figure(fig, filename or _default_filename('player_comparison', quality), quality)
+    _pyplot().show()
 
-    team_data = df[df['team_name'].str.contains(team_name, case=False)]
+
+# team_data : joueurs de l'équipe, tels que renvoyés par NBADatabase.get_team_stats
+def build_team_analysis(team_data: pd.DataFrame, team_name: str,
+                        use_pyplot: bool = False) -> Optional['Figure']:
 
     if team_data.empty:
         print("✗ Équipe non trouvée")
-        return
+        return None
 
     team_data = team_data.sort_values('points_per_game', ascending=False).head(8)
 
     # Créer le graphique
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = _new_figure((12, 6), use_pyplot)
+    ax = fig.add_subplot()
 
     x = range(len(team_data))
     width = 0.25
@@ -119,63 +180,159 @@ def plot_team_analysis(df: pd.DataFrame, team_name: str):
     ax.grid(axis='y', alpha=0.3, linestyle='--', linewidth=0.5)
     ax.set_axisbelow(True)
 
-    plt.tight_layout()
-    plt.savefig('team_analysis.png', dpi=300, bbox_inches='tight')
-    print("✓ Graphique sauvegardé: team_analysis.png")
-    plt.show()
+    fig.tight_layout()
+    return fig
 
 
-def plot_efficiency_scatter(df: pd.DataFrame):
+def plot_team_analysis(team_data: pd.DataFrame, team_name: str, quality: str = 'final',
+                       filename: Optional[str] = None):
+
+    fig = build_team_analysis(team_data, team_name, use_pyplot=True)
+    if fig is None:
+        return
+    save_figure(fig, filename or _default_filename('team_analysis', quality), quality)
+    _pyplot().show()
+
+
+# au-delà de SCATTER_AGGREGATE_THRESHOLD joueurs, un point par joueur devient illisible et lent :
+# le nuage est remplacé par une grille de densité (histogramme 2D NumPy), dont le coût de
+# dessin ne dépend plus du nombre de lignes, et seuls les SCATTER_LABELS meilleurs sont nommés
+SCATTER_AGGREGATE_THRESHOLD = 2000
+SCATTER_BINS = 60
+SCATTER_LABELS = 8
+
+
+# indices des k plus grandes valeurs, de la plus grande à la plus petite (sans tri complet)
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(values))
+    if k == 0:
+        return np.array([], dtype=int)
+    candidates = np.argpartition(values, len(values) - k)[len(values) - k:]
+    return candidates[np.argsort(values[candidates])[::-1]]
+
+
+# nombre de points par case : grille (lignes = y) et étendue (xmin, xmax, ymin, ymax)
+def density_grid(x: np.ndarray, y: np.ndarray, bins: int = SCATTER_BINS):
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return counts.T, (x_edges[0], x_edges[-1], y_edges[0], y_edges[-1])
+
+
+# données du nuage d'efficacité, communes au fichier (build_efficiency_scatter) et au panneau
+# de la GUI : joueurs d'au moins 15 matchs aux valeurs finies, grille de densité en mode
+# agrégé, et joueurs à nommer (texte, x, y)
+class ScatterData(NamedTuple):
+    points: np.ndarray
+    efficiency: np.ndarray
+    sizes: np.ndarray
+    colors: np.ndarray
+    labels: List[Tuple[str, float, float]]
+    aggregate: bool
+    counts: Optional[np.ndarray]
+    extent: Optional[Tuple[float, float, float, float]]
+    title: str
+    color_label: str
 
-    # Calculer l'efficacité
-    df = df.copy()
-    df['efficiency'] = df['points_per_game'] + df['rebounds_per_game'] + df['assists_per_game']
+
+def efficiency_scatter_data(df: pd.DataFrame, aggregate: Optional[bool] = None) -> ScatterData:
 
     # Filtrer les joueurs avec au moins 15 matchs
     df = df[df['games_played'] >= 15]
 
-    # Créer le graphique
-    fig, ax = plt.subplots(figsize=(10, 8))
+    # L'efficacité vient de la base (colonne générée), sinon on la calcule
+    if 'efficiency' not in df.columns:
+        df = df.assign(efficiency=df['points_per_game'] + df['rebounds_per_game']
+                       + df['assists_per_game'])
+
+    # une statistique manquante ou infinie ferait échouer histogram2d et polyfit
+    points = df['points_per_game'].to_numpy(dtype=float)
+    efficiency = df['efficiency'].to_numpy(dtype=float)
+    valid = np.isfinite(points) & np.isfinite(efficiency)
+    df, points, efficiency = df[valid], points[valid], efficiency[valid]
+    if aggregate is None:
+        aggregate = len(df) > SCATTER_AGGREGATE_THRESHOLD
+
+    counts = extent = None
+    score = efficiency
+    if aggregate:
+        counts, extent = density_grid(points, efficiency)
+        title = f'Points vs Efficacité globale ({len(df):,} joueurs)'
+        color_label = 'Joueurs par case'
+        # noms des joueurs qui dépassent le plus la tendance (efficacité attendue pour leur
+        # nombre de points), sinon ils seraient tous au même coin
+        if len(df) > 1:
+            slope, intercept = np.polyfit(points, efficiency, 1)
+            score = efficiency - (slope * points + intercept)
+    else:
+        title = 'Points vs Efficacité globale'
+        color_label = 'Passes par match'
+
+    names = df['player_name'].to_numpy()
+    labels = [(names[i], points[i], efficiency[i]) for i in top_k_indices(score, SCATTER_LABELS)]
+    return ScatterData(points, efficiency,
+                       df['games_played'].to_numpy(dtype=float) * 3,
+                       df['assists_per_game'].to_numpy(dtype=float),
+                       labels, aggregate, counts, extent, title, color_label)
+
+
+def build_efficiency_scatter(df: pd.DataFrame, use_pyplot: bool = False,
+                             aggregate: Optional[bool] = None) -> 'Figure':
+
+    data = efficiency_scatter_data(df, aggregate)
 
-    scatter = ax.scatter(df['points_per_game'], df['efficiency'],
-                         s=df['games_played'] * 3, alpha=0.6,
-                         c=df['assists_per_game'], cmap='viridis',
-                         edgecolors='black', linewidth=0.5)
+    # Créer le graphique
+    fig = _new_figure((10, 8), use_pyplot)
+    ax = fig.add_subplot()
+
+    if data.aggregate:
+        from matplotlib.colors import LogNorm
+        image = ax.imshow(np.ma.masked_equal(data.counts, 0), origin='lower', extent=data.extent,
+                          aspect='auto', cmap='viridis', norm=LogNorm(), interpolation='nearest')
+    else:
+        image = ax.scatter(data.points, data.efficiency,
+                           s=data.sizes, alpha=0.6,
+                           c=data.colors, cmap='viridis',
+                           edgecolors='black', linewidth=0.5)
 
     # Ajouter les noms des meilleurs joueurs
-    top_players = df.nlargest(8, 'efficiency')
-    for _, player in top_players.iterrows():
-        ax.annotate(player['player_name'],
-                    (player['points_per_game'], player['efficiency']),
+    for name, x, y in data.labels:
+        ax.annotate(name, (x, y),
                     xytext=(5, 5), textcoords='offset points',
                     fontsize=8, alpha=0.8)
 
     # Labels
     ax.set_xlabel('Points par match', fontsize=11, fontweight='bold')
     ax.set_ylabel('Score d\'efficacité', fontsize=11, fontweight='bold')
-    ax.set_title('Points vs Efficacité globale', fontsize=14, fontweight='bold', pad=20)
+    ax.set_title(data.title, fontsize=14, fontweight='bold', pad=20)
 
     # Colorbar
-    cbar = plt.colorbar(scatter, ax=ax)
-    cbar.set_label('Passes par match', fontsize=10)
+    cbar = fig.colorbar(image, ax=ax)
+    cbar.set_label(data.color_label, fontsize=10)
 
     # Grille
     ax.grid(alpha=0.3, linestyle='--', linewidth=0.5)
     ax.set_axisbelow(True)
 
-    plt.tight_layout()
-    plt.savefig('efficiency_scatter.png', dpi=300, bbox_inches='tight')
-    print("✓ Graphique sauvegardé: efficiency_scatter.png")
-    plt.show()
+    fig.tight_layout()
+    return fig
+
+
+def plot_efficiency_scatter(df: pd.DataFrame, quality: str = 'final',
+                            filename: Optional[str] = None):
 
+    fig = build_efficiency_scatter(df, use_pyplot=True)
+    save_figure(fig, filename or _default_filename('efficiency_scatter', quality), quality)
+    _pyplot().show()
 
-def plot_shooting_percentages(df: pd.DataFrame, limit: int = 10):
+
+def build_shooting_percentages(df: pd.DataFrame, limit: int = 10,
+                               use_pyplot: bool = False) -> 'Figure':
 
     # Filtrer et trier
     data = df[df['games_played'] >= 15].nlargest(limit, 'points_per_game')
 
     # Créer le graphique
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig = _new_figure((12, 6), use_pyplot)
+    ax = fig.add_subplot()
 
     x = range(len(data))
     width = 0.25
@@ -199,7 +356,13 @@ def plot_shooting_percentages(df: pd.DataFrame, limit: int = 10):
     ax.set_axisbelow(True)
     ax.set_ylim(0, 100)
 
-    plt.tight_layout()
-    plt.savefig('shooting_percentages.png', dpi=300, bbox_inches='tight')
-    print("✓ Graphique sauvegardé: shooting_percentages.png")
-    plt.show()
\ No newline at end of file
+    fig.tight_layout()
+    return fig
+
+
+def plot_shooting_percentages(df: pd.DataFrame, limit: int = 10, quality: str = 'final',
+                              filename: Optional[str] = None):
+
+    fig = build_shooting_percentages(df, limit, use_pyplot=True)
+    save_figure(fig, filename or _default_filename('shooting_percentages', quality), quality)
+    _pyplot().show()
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# les modules de src/ s'importent à plat (from database import ...), comme depuis src/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from database import NBADatabase  # noqa: E402
+
+
+# base neuve (toutes les migrations) dans un dossier temporaire
+@pytest.fixture
+def db(tmp_path):
+    database = NBADatabase(str(tmp_path / "nba_stats.db"))
+    database.connect()
+    database.create_tables()
+    yield database
+    database.close()
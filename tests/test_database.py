@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+from database import RANK_MIN_GAMES
+from synthetic import generate_game_logs, generate_players
+
+
+# recharger une saison déjà en base met les lignes à jour (triggers de team_changes, v9)
+def test_insert_same_season_twice_updates_rows(db):
+    players = generate_players(1, 50)
+    db.insert_players(players)
+
+    players['ppg'] = players['ppg'] + 1
+    db.insert_players(players)
+
+    stored = db.conn.execute(
+        "SELECT player_id, points_per_game FROM players ORDER BY player_id").fetchall()
+    assert stored == list(zip(players['player_id'].tolist(), players['ppg'].tolist()))
+    assert db.conn.execute("SELECT COUNT(*) FROM team_changes").fetchone()[0] == 0
+
+
+# une écriture annulée est signalée à l'appelant (GUI, mode batch) au lieu d'être ignorée
+def test_failed_insert_raises(db):
+    db.conn.execute("CREATE TRIGGER refuse BEFORE INSERT ON players "
+                    "BEGIN SELECT RAISE(ABORT, 'refusé'); END")
+
+    with pytest.raises(sqlite3.Error):
+        db.insert_players(generate_players(1, 10))
+    assert db.conn.execute("SELECT COUNT(*) FROM players").fetchone()[0] == 0
+
+
+# classements recalculés après le commit, avec la même règle de matchs joués que get_ranked
+def test_rankings_refreshed_after_insert(db):
+    players = generate_players(1, 100)
+    players.loc[0, 'games_played'] = RANK_MIN_GAMES
+    players.loc[0, 'ppg'] = 99.0
+    db.insert_players(players)
+
+    assert db.conn.execute("SELECT COUNT(*) FROM rank_changes").fetchone()[0] == 0
+    ranked = db.get_ranked('points_per_game', limit=len(players))
+    eligible = players[players['games_played'] > RANK_MIN_GAMES]
+    assert len(ranked) == len(eligible)
+    assert players.loc[0, 'player_id'] not in ranked['player_id'].tolist()
+    assert ranked['rank'].tolist() == sorted(ranked['rank'].tolist())
+
+
+# même règle pour les matchs : une écriture refusée remonte et n'écrit rien
+def test_failed_game_log_insert_raises(db):
+    players = generate_players(1, 5)
+    db.conn.execute("CREATE TRIGGER refuse BEFORE INSERT ON game_logs "
+                    "BEGIN SELECT RAISE(ABORT, 'refusé'); END")
+
+    with pytest.raises(sqlite3.Error):
+        db.insert_game_logs(generate_game_logs(players))
+    assert db.conn.execute("SELECT COUNT(*) FROM game_logs").fetchone()[0] == 0
+
+
+# min_games est un minimum inclusif : 15 matchs suffisent pour le graphique de tir
+def test_get_ranked_min_games_inclusive(db):
+    players = generate_players(1, 50)
+    players.loc[0, 'games_played'] = 15
+    players.loc[1, 'games_played'] = 14
+    db.insert_players(players)
+
+    ranked = db.get_ranked('points_per_game', limit=len(players), min_games=15)
+    assert players.loc[0, 'player_id'] in ranked['player_id'].tolist()
+    assert players.loc[1, 'player_id'] not in ranked['player_id'].tolist()
+    assert (ranked['games_played'] >= 15).all()
@@ -0,0 +1,58 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from synthetic import generate_players
+
+
+@pytest.fixture
+def players(db):
+    players = generate_players(2, 40)
+    db.insert_players(players)
+    return players
+
+
+# l'extension choisit le format ; les .gz se relisent avec gzip
+@pytest.mark.parametrize('name', ['out.csv', 'out.csv.gz', 'out.jsonl', 'out.jsonl.gz'])
+def test_export_formats(db, players, tmp_path, name):
+    target = str(tmp_path / name)
+
+    count = db.export_players(target)
+
+    opener = gzip.open if name.endswith('.gz') else open
+    with opener(target, 'rt', encoding='utf-8', newline='') as f:
+        if '.csv' in name:
+            rows = list(csv.DictReader(f))
+        else:
+            rows = [json.loads(line) for line in f]
+    assert count == len(rows) == len(players)
+    assert {int(row['player_id']) for row in rows} == set(players['player_id'])
+
+
+def test_export_filters(db, players, tmp_path):
+    season = players['season'].max()
+    team = players.loc[players['season'] == season, 'team_name'].iloc[0]
+    target = str(tmp_path / 'out.jsonl')
+
+    count = db.export_players(target, season=season, team=team.lower(), min_games=20)
+
+    expected = players[(players['season'] == season) & (players['team_name'] == team)
+                       & (players['games_played'] >= 20)]
+    rows = [json.loads(line) for line in open(target, encoding='utf-8')]
+    assert count == len(expected) > 0
+    assert sorted(row['player_id'] for row in rows) == sorted(expected['player_id'])
+
+
+# `export - --format csv.gz` : des octets gzip sur stdout, pas du texte
+def test_export_gzip_to_stdout(db, players):
+    stdout = io.TextIOWrapper(io.BytesIO(), encoding='utf-8')
+
+    count = db.export_players('-', fmt='csv.gz', stream=stdout)
+
+    data = gzip.decompress(stdout.buffer.getvalue()).decode('utf-8')
+    assert count == len(players)
+    assert data.splitlines()[0].startswith('player_id,')
+    assert len(data.splitlines()) == len(players) + 1
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from game_analytics import form_trends, longest_streaks, rolling_averages, streaks
+from synthetic import generate_game_logs, generate_players
+
+
+def _logs():
+    # deux joueurs, lignes dans le désordre : les calculs trient par (joueur, date)
+    return pd.DataFrame({
+        'player_id': [2, 1, 1, 2, 1, 1, 2],
+        'game_date': pd.to_datetime(['2024-10-03', '2024-10-04', '2024-10-01', '2024-10-01',
+                                     '2024-10-02', '2024-10-03', '2024-10-02']),
+        'pts': [30, 25, 10, 5, 20, 22, 24],
+    })
+
+
+# la fenêtre ne déborde pas sur le joueur précédent
+def test_rolling_averages_per_player():
+    rolled = rolling_averages(_logs(), window=2, stats=['pts'])
+
+    assert rolled['player_id'].tolist() == [1, 1, 1, 1, 2, 2, 2]
+    assert rolled['pts_avg2'].tolist() == [10.0, 15.0, 21.0, 23.5, 5.0, 14.5, 27.0]
+
+
+def test_rolling_averages_min_periods():
+    rolled = rolling_averages(_logs(), window=3, stats=['pts'], min_periods=3)
+
+    assert rolled['pts_avg3'].isna().tolist() == [True, True, False, False, True, True, False]
+
+
+# même résultat que le rolling pandas groupé sur une ligue synthétique
+def test_rolling_averages_matches_pandas():
+    logs = generate_game_logs(generate_players(1, 20))
+
+    rolled = rolling_averages(logs, window=5, stats=['reb'])
+
+    expected = (rolled.groupby('player_id')['reb'].rolling(5, min_periods=1).mean()
+                .round(1).to_numpy())
+    np.testing.assert_allclose(rolled['reb_avg5'].to_numpy(), expected)
+
+
+def test_streaks_reset_on_miss_and_new_player():
+    logs = _logs()
+
+    result = streaks(logs, logs['pts'] >= 20)
+
+    assert result['streak'].tolist() == [0, 1, 2, 3, 0, 1, 2]
+    best = longest_streaks(logs, logs['pts'] >= 20)
+    assert best.set_index('player_id')['longest_streak'].to_dict() == {1: 3, 2: 2}
+
+
+def test_form_trends_uses_last_game():
+    trends = form_trends(_logs(), 'pts', short=1, long=3)
+
+    assert trends['player_id'].tolist() == [2, 1]
+    # moyennes arrondies au dixième : 30 - 19.7 et 25 - 22.3
+    assert trends['trend'].tolist() == [10.3, 2.7]
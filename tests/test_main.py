@@ -0,0 +1,78 @@
+import json
+
+import pandas as pd
+import pytest
+
+import main
+import scraper
+from synthetic import generate_players
+
+
+@pytest.fixture
+def db_path(tmp_path, db):
+    db.insert_players(generate_players(1, 30))
+    return db.db_name
+
+
+def _run(db_path, capsys, *argv):
+    snapshots = db_path.replace('.db', '_snapshots')
+    status = main.run_batch(['--db', db_path, '--snapshot-dir', snapshots, *argv])
+    return status, capsys.readouterr()
+
+
+# opérations enchaînées avec '+' dans le même processus, une entrée JSON par opération
+def test_batch_chains_operations(db_path, capsys):
+    status, out = _run(db_path, capsys, '--json', 'top', '--limit', '3', '+', 'team', 'zzz')
+
+    report = json.loads(out.out)
+    assert status == 0 and report['status'] == 0
+    assert [op['command'] for op in report['operations']] == ['top', 'team']
+    assert len(report['operations'][0]['rows']) == 3
+
+
+# le rapport du cache de l'API (un seul scraper pour tout le lot) figure dans la sortie JSON
+def test_fetch_reports_api_cache(db_path, capsys, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    players = generate_players(1, 10)
+    monkeypatch.setattr(scraper.NBAStatsScraper, 'fetch_league_leaders',
+                        lambda self, season=None, as_frame=False: players)
+    monkeypatch.setattr(scraper.NBAStatsScraper, 'fetch_standings',
+                        lambda self, season=None: pd.DataFrame(
+                            {'team_id': [1], 'team_name': ['LAL'], 'full_name': ['Lakers'],
+                             'wins': [50], 'losses': [32], 'win_pct': [61.0],
+                             'season': ['2024-25']}))
+
+    status, out = _run(db_path, capsys, '--json', 'fetch', '+', 'fetch')
+
+    report = json.loads(out.out)
+    assert status == 0
+    assert [op['players'] for op in report['operations']] == [10, 10]
+    assert set(report['operations'][0]['cache']) >= {'hits', 'misses', 'hit_rate'}
+
+
+# API injoignable : le scraper renvoie un résultat vide, la commande échoue (code retour 1)
+def test_fetch_without_data_fails(db_path, capsys, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper.NBAStatsScraper, 'fetch_league_leaders',
+                        lambda self, season=None, as_frame=False: pd.DataFrame())
+
+    status, out = _run(db_path, capsys, '--json', 'fetch', '+', 'top')
+
+    report = json.loads(out.out)
+    assert status == 1 and report['status'] == 1
+    assert [op['command'] for op in report['operations']] == ['fetch']
+    assert 'error' in report['operations'][0]
+
+
+def test_compare_unknown_player_fails(db_path, capsys):
+    status, out = _run(db_path, capsys, 'compare', 'Personne Inconnue', 'Qui Nexiste')
+
+    assert status == 1
+    assert 'Personne Inconnue' in out.out
+
+
+# une option globale après '+' serait ignorée : elle est refusée
+def test_global_option_after_separator_rejected(db_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        _run(db_path, capsys, 'top', '+', '--json', 'top')
+    assert exit_info.value.code == 2
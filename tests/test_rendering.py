@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from rendering import ChartCache, ChartJob, render_jobs, report_jobs
+from synthetic import generate_players
+from visualizations import build_top_scorers
+
+
+@pytest.fixture
+def frame(db):
+    db.insert_players(generate_players(1, 40))
+    return db.get_players_frame()
+
+
+# la clé dépend des données, des paramètres et de la qualité, pas de l'objet DataFrame
+def test_chart_cache_key(frame):
+    key = ChartCache.key(build_top_scorers, (frame, 10))
+
+    assert key == ChartCache.key(build_top_scorers, (frame.copy(), 10))
+    assert key != ChartCache.key(build_top_scorers, (frame, 5))
+    assert key != ChartCache.key(build_top_scorers, (frame, 10), 'preview')
+    changed = frame.copy()
+    changed.loc[0, 'points_per_game'] += 1
+    assert key != ChartCache.key(build_top_scorers, (changed, 10))
+
+
+# second rendu des mêmes graphiques : images reprises du cache ; un échec n'arrête pas le lot
+def test_render_jobs_with_cache(frame, tmp_path):
+    cache = ChartCache(str(tmp_path / "cache"))
+    season = frame['season'].max()
+    jobs = [ChartJob('top-scorers', {'limit': 5, 'season': season}, quality='preview'),
+            ChartJob('team', {'team': 'ZZZ', 'season': season}, quality='preview')]
+    output_dir = str(tmp_path / "charts")
+
+    first = render_jobs(frame, jobs, output_dir, cache)
+    second = render_jobs(frame, jobs, output_dir, cache)
+
+    assert [r['error'] is None for r in first] == [True, False]
+    assert os.path.exists(first[0]['file'])
+    assert first[0]['file'].endswith(f"top-scorers_5_{season}.png")
+    assert second[0]['file'] == first[0]['file']
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_report_jobs_one_per_team(frame):
+    season = frame['season'].max()
+
+    jobs = report_jobs(frame)
+
+    teams = sorted(frame.loc[frame['season'] == season, 'team_name'].dropna().unique())
+    assert [job.params['team'] for job in jobs if job.chart == 'team'] == teams
+    assert [job.chart for job in jobs if job.chart != 'team'] == ['top-scorers', 'shooting',
+                                                                  'scatter']
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from disk_cache import evict_lru
+from scraper import (ResponseCache, current_season_start, transform_game_logs,
+                     transform_leaders, transform_standings)
+
+FRAME = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+
+
+# saison terminée : gardée indéfiniment ; saison en cours : expire après le TTL
+def test_cache_ttl_depends_on_season(tmp_path):
+    cache = ResponseCache(str(tmp_path), current_season_ttl_minutes=-1)
+    start = current_season_start()
+    current = f"{start}-{str(start + 1)[-2:]}"
+
+    cache.put('LeagueLeaders', {'season': '2000-01'}, FRAME, season='2000-01')
+    cache.put('LeagueLeaders', {'season': current}, FRAME, season=current)
+
+    pd.testing.assert_frame_equal(cache.get('LeagueLeaders', {'season': '2000-01'}), FRAME)
+    assert cache.get('LeagueLeaders', {'season': current}) is None
+    assert (cache.hits, cache.misses, cache.expired) == (1, 1, 1)
+
+
+# au-delà de la taille max, l'entrée la moins récemment lue est supprimée
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('E', {'n': 1}, FRAME, season='2000-01')
+    size = os.path.getsize(cache._path('E', {'n': 1}))
+    cache.max_size_bytes = 2 * size
+    cache.put('E', {'n': 2}, FRAME, season='2000-01')
+    # n=1 relue plus récemment que n=2
+    os.utime(cache._path('E', {'n': 2}), (1, 1))
+
+    cache.put('E', {'n': 3}, FRAME, season='2000-01')
+
+    assert cache.evictions == 1
+    assert cache.get('E', {'n': 2}) is None
+    assert cache.get('E', {'n': 1}) is not None
+    assert cache.report()['entries'] == 2
+
+
+def test_evict_lru_removes_entries_past_max_age(tmp_path):
+    for name in ('old.png', 'new.png', 'skip.tmp'):
+        (tmp_path / name).write_bytes(b'x')
+    os.utime(tmp_path / 'old.png', (1, 1))
+    os.utime(tmp_path / 'skip.tmp', (1, 1))
+
+    evicted = evict_lru(str(tmp_path), 10 ** 6, lambda name: not name.endswith('.tmp'),
+                        max_age=3600)
+
+    assert evicted == 1
+    assert sorted(os.listdir(tmp_path)) == ['new.png', 'skip.tmp']
+
+
+def test_transform_leaders():
+    raw = pd.DataFrame({
+        'PLAYER_ID': [1, 2], 'PLAYER': ['A', 'B'], 'TEAM': ['LAL', 'BOS'],
+        'GP': [70, 10], 'PTS': [25.04, np.nan], 'REB': [7.0, 1.0], 'AST': [8.0, 0.5],
+        'STL': [1.0, 0.0], 'BLK': [0.5, 0.0],
+        'FG_PCT': [0.5134, np.nan], 'FG3_PCT': [0.376, 0.0], 'FT_PCT': [0.9, 1.0],
+    })
+
+    out = transform_leaders(raw, '2024-25')
+
+    assert out['position'].tolist() == ['N/A', 'N/A']
+    assert out['ppg'].tolist() == [25.0, 0.0]
+    assert out['fg_pct'].tolist() == [51.3, 0.0]
+    assert (out['season'] == '2024-25').all()
+
+
+def test_transform_game_logs():
+    raw = pd.DataFrame({
+        'PLAYER_ID': [1, 1], 'GAME_ID': ['0022400061', '0022400070'],
+        'GAME_DATE': ['2024-10-22T00:00:00', '2024-10-24T00:00:00'],
+        'TEAM_ABBREVIATION': ['LAL', 'LAL'], 'MATCHUP': ['LAL vs. MIN', 'LAL @ PHX'],
+        'WL': ['W', 'L'], 'MIN': [35.25, 30.0], 'PTS': [16, np.nan],
+    })
+
+    out = transform_game_logs(raw, '2024-25')
+
+    assert out['game_id'].tolist() == [22400061, 22400070]
+    assert out['game_date'].tolist() == ['2024-10-22', '2024-10-24']
+    assert out['win'].tolist() == [1, 0]
+    assert out['pts'].tolist() == [16, 0] and out['pts'].dtype == 'int16'
+    assert out['minutes'].tolist() == [35.2, 30.0]
+
+
+def test_transform_standings():
+    raw = pd.DataFrame({'TeamID': [1610612747], 'TeamCity': ['Los Angeles'],
+                        'TeamName': ['Lakers'], 'WINS': [50], 'LOSSES': [32], 'WinPCT': [0.61]})
+
+    out = transform_standings(raw, '2024-25')
+
+    assert out.iloc[0].to_dict() == {'team_id': 1610612747, 'team_name': 'LAL',
+                                     'full_name': 'Los Angeles Lakers', 'wins': 50,
+                                     'losses': 32, 'win_pct': 61.0, 'season': '2024-25'}
@@ -0,0 +1,37 @@
+import numpy as np
+
+from similarity import PlayerSimilarity
+from synthetic import generate_players
+
+
+# une petite écriture met les lignes à jour sans renormaliser : mêmes voisins qu'un index neuf
+def test_incremental_update_matches_rebuild(db):
+    players = generate_players(3, 200)
+    db.insert_players(players)
+    index = PlayerSimilarity(db)
+    mean = index.mean.copy()
+
+    changed = players[players['season'] == players['season'].max()].head(3).copy()
+    changed['ppg'] = changed['ppg'] + 0.1
+    db.insert_players(changed)
+
+    assert np.array_equal(index.mean, mean)
+    assert index._stale
+    rebuilt = PlayerSimilarity(db)
+    for player_id in changed['player_id']:
+        assert (index.most_similar(int(player_id), k=5)['player_id'].tolist()
+                == rebuilt.most_similar(int(player_id), k=5)['player_id'].tolist())
+    index.close()
+    rebuilt.close()
+
+
+# les autres saisons du même joueur ne sont pas proposées comme joueurs similaires
+def test_most_similar_excludes_same_player(db):
+    db.insert_players(generate_players(5, 30))
+    index = PlayerSimilarity(db)
+
+    player_id = int(index.info.loc[0, 'player_id'])
+    result = index.most_similar(player_id, k=10)
+    assert len(result) == 10
+    assert player_id not in result['player_id'].tolist()
+    index.close()
@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+
+import snapshot
+from database import NBADatabase
+from rendering import report_jobs
+from snapshot import CURRENT, load_snapshot, read_manifest, write_snapshot
+from synthetic import generate_players
+
+
+# chaque écriture publie une nouvelle version par CURRENT ; les versions remplacées
+# sont supprimées une fois le délai de grâce passé
+def test_write_publishes_new_version(tmp_path, monkeypatch):
+    directory = str(tmp_path / "snapshots")
+    players = generate_players(2, 20)
+
+    write_snapshot(players, directory, data_version=1)
+    first = open(os.path.join(directory, CURRENT)).read()
+    monkeypatch.setattr(snapshot, 'SUPERSEDED_GRACE_SECONDS', 0)
+    write_snapshot(players, directory, data_version=2)
+    write_snapshot(players, directory, data_version=3)
+
+    current = open(os.path.join(directory, CURRENT)).read()
+    assert current != first
+    assert sorted(os.listdir(directory)) == [CURRENT, current]
+    assert read_manifest(directory)['data_version'] == 3
+    assert load_snapshot(directory)['player_id'].tolist() == players['player_id'].tolist()
+
+
+# textes NULL et ordre des lignes conservés : SQL et instantané donnent le même DataFrame
+def test_snapshot_round_trip_matches_sql(tmp_path):
+    players = generate_players(2, 30)
+    players.loc[[0, 35], 'team_name'] = None
+    players.loc[3, 'position'] = None
+    # écriture dans le désordre : l'ordre vient de la requête, pas de l'insertion
+    players = players.iloc[::-1]
+
+    database = NBADatabase(str(tmp_path / "nba_stats.db"), snapshot_dir=str(tmp_path / "snapshots"))
+    database.connect()
+    database.create_tables()
+    database.insert_players(players)
+
+    from_sql = database.get_players_frame()
+    database.close()
+    database = NBADatabase(str(tmp_path / "nba_stats.db"), snapshot_dir=str(tmp_path / "snapshots"))
+    database.connect()
+    from_snapshot = database.get_players_frame()
+    database.close()
+
+    assert read_manifest(str(tmp_path / "snapshots")) is not None
+    pd.testing.assert_frame_equal(from_snapshot, from_sql)
+    assert from_snapshot['team_name'].isna().sum() == 2
+    assert all(job.params['team'] for job in report_jobs(from_snapshot) if job.chart == 'team')
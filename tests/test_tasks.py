@@ -0,0 +1,86 @@
+import threading
+import time
+
+from tasks import TaskRunner
+
+
+# racine minimale : TaskRunner n'utilise que root.after pour vider sa file
+class _Root:
+
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append(callback)
+
+    def drain(self, runner):
+        while runner.running:
+            callback = self.pending.pop(0)
+            callback()
+
+
+# annulation demandée après l'écriture : le résultat validé est quand même rapporté
+def test_cancel_after_commit_reports_result():
+    root = _Root()
+    runner = TaskRunner(root, max_workers=1, poll_ms=0)
+    committed, resume = threading.Event(), threading.Event()
+    results = []
+
+    def job(task):
+        task.check_cancelled()
+        task.mark_committed()
+        committed.set()
+        resume.wait(5)
+        task.check_cancelled()
+        return 'écrit', task.cancelled
+
+    task = runner.submit('fetch', job, on_done=results.append)
+    committed.wait(5)
+    task.cancel()
+    resume.set()
+    root.drain(runner)
+    runner.shutdown()
+
+    assert results == [('écrit', True)]
+
+
+# annulation avant l'écriture : ni résultat ni erreur
+def test_cancel_before_commit_drops_result():
+    root = _Root()
+    runner = TaskRunner(root, max_workers=1, poll_ms=0)
+    started, resume = threading.Event(), threading.Event()
+    results, errors = [], []
+
+    def job(task):
+        started.set()
+        resume.wait(5)
+        task.check_cancelled()
+        task.mark_committed()
+        return 'écrit'
+
+    task = runner.submit('fetch', job, on_done=results.append, on_error=errors.append)
+    started.wait(5)
+    task.cancel()
+    resume.set()
+    root.drain(runner)
+    runner.shutdown()
+
+    assert results == [] and errors == []
+
+
+# shutdown attend la tâche en cours : la base n'est fermée qu'après son écriture
+def test_shutdown_waits_for_running_task():
+    runner = TaskRunner(_Root(), max_workers=1, poll_ms=0)
+    started = threading.Event()
+    finished = []
+
+    def job(task):
+        started.set()
+        time.sleep(0.2)
+        finished.append(task.cancelled)
+
+    runner.submit('fetch', job)
+    started.wait(5)
+    runner.shutdown()
+
+    assert finished == [True]